@@ -0,0 +1,134 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import response_factor as rf
+import miura_method as mm
+from wall_fdm import WallFDMSolver
+
+# 留数定理の根の計算方法（Numbaが使える場合はNumbaでコンパイルした関数を使う）
+try:
+    import numba
+    MATSUO_BACKEND = 'numba'
+except ImportError:
+    MATSUO_BACKEND = 'python'
+
+
+def calc_step_response_error(R: np.ndarray, C: np.ndarray, n_layers: int, delta_t: float,
+                             roots: Tuple[float, np.ndarray, np.ndarray, np.ndarray], duration: float = 100.0,
+                             network: Tuple[np.ndarray, np.ndarray] = None) -> float:
+    """三浦の方法で分割した後退差分法の単位応答と、留数定理による単位応答の差（RMSE）を計算する
+
+    Args:
+        R (np.ndarray): 熱抵抗（室内側から）[m2･K/W]
+        C (np.ndarray): 熱容量（室内側から）[J/(m2･K)]
+        n_layers (int): 壁体内の分割層数
+        delta_t (float): 時間間隔[s]
+        roots (Tuple[float, np.ndarray, np.ndarray, np.ndarray]): calc_alpha_matsuo_methodの戻り値 (a0, aa, at, alpha)
+        duration (float): 単位応答を比較する時間[h]
+        network (Tuple[np.ndarray, np.ndarray]): 分割済みの virtual_R, virtual_C（Noneの場合はここで分割する）
+
+    Returns:
+        float: 吸熱応答、貫流応答のRMSEの大きい方[W/(m2･K)]
+    """
+
+    if network is None:
+        network = mm.miura_method_batch(R_list=[R], C_list=[C], layers=[n_layers])[n_layers]
+    virtual_R, virtual_C = network
+
+    n_max = max(int(duration * 3600 / delta_t), 1)
+
+    solver = WallFDMSolver(virtual_R=virtual_R, virtual_C=virtual_C, delta_t=delta_t)
+    q_a, q_t = solver.calc_step_response(n_max=n_max)
+
+    a0, aa, at, alpha = roots
+    phi_a, phi_t = rf.calc_step_response_factor_matrix(aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+
+    def rmse(x: np.ndarray, y: np.ndarray) -> float:
+        return float(np.sqrt(np.mean((x - y) ** 2)))
+
+    return max(rmse(phi_a, q_a[0]), rmse(phi_t, q_t[0]))
+
+
+def select_fdm_grid(R: np.ndarray, C: np.ndarray, tol: float, delta_ts: List[float], layers: List[int],
+                    duration: float = 100.0, n_alpha_max: int = 200) -> Dict:
+    """単位応答の差が許容値以下となる、最も大きい時間間隔と最も粗い分割層数を二分法で選ぶ
+
+    時間間隔は最も細かい分割層数で許容値を満たす最大のものを選び、
+    その時間間隔で許容値を満たす最小の分割層数を選ぶ
+    誤差は時間間隔について単調増加、分割層数について単調減少と仮定する
+    （仮定が成り立たない場合も、戻り値の格子は誤差を計算して許容値以下であることを確かめたもの）
+
+    Args:
+        R (np.ndarray): 熱抵抗（室内側から）[m2･K/W]
+        C (np.ndarray): 熱容量（室内側から）[J/(m2･K)]
+        tol (float): 吸熱応答、貫流応答のRMSEの許容値[W/(m2･K)]
+        delta_ts (List[float]): 時間間隔の候補[s]
+        layers (List[int]): 分割層数の候補
+        duration (float): 単位応答を比較する時間[h]
+        n_alpha_max (int): 留数定理による根の数の最大値
+
+    Returns:
+        Dict: 選んだ時間間隔 'delta_t'、分割層数 'n_layers'、その誤差 'error'、誤差の計算回数 'n_evaluations'
+    """
+
+    R = np.asarray(R, dtype=float)
+    C = np.asarray(C, dtype=float)
+    delta_ts = sorted(float(delta_t) for delta_t in delta_ts)
+    layers = sorted(int(n_layers) for n_layers in layers)
+
+    # 留数定理の根は時間間隔、分割層数によらないため1回だけ求める
+    roots = rf.calc_alpha_matsuo_method(rs=R, cs=C, i_max=n_alpha_max, backend=MATSUO_BACKEND)
+
+    networks = mm.miura_method_batch(R_list=[R], C_list=[C], layers=layers)
+    networks = {n_layers: (virtual_R[0], virtual_C[0]) for n_layers, (virtual_R, virtual_C) in networks.items()}
+
+    errors = {}
+
+    def error(i_dt: int, i_layers: int) -> float:
+        if (i_dt, i_layers) not in errors:
+            n_layers = layers[i_layers]
+            errors[(i_dt, i_layers)] = calc_step_response_error(
+                R=R, C=C, n_layers=n_layers, delta_t=delta_ts[i_dt], roots=roots, duration=duration,
+                network=networks[n_layers])
+        return errors[(i_dt, i_layers)]
+
+    def bisect(n: int, is_ok) -> int:
+        # is_ok(0)が真でis_okが単調減少のとき、is_okが真となる最大の番号を返す
+        lo, hi = 0, n
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if is_ok(mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    i_layers_max = len(layers) - 1
+    if error(0, i_layers_max) > tol:
+        raise ValueError('tol cannot be achieved with the given delta_ts and layers '
+                         '(error {0:.3e} at delta_t={1}, n_layers={2})'.format(
+                             error(0, i_layers_max), delta_ts[0], layers[-1]))
+
+    # 最も細かい分割層数で許容値を満たす最大の時間間隔
+    i_dt = bisect(len(delta_ts), lambda i: error(i, i_layers_max) <= tol)
+    # その時間間隔で許容値を満たす最小の分割層数（番号を逆順にして最大の番号を探す）
+    i_layers = i_layers_max - bisect(len(layers), lambda i: error(i_dt, i_layers_max - i) <= tol)
+
+    return {
+        'delta_t': delta_ts[i_dt],
+        'n_layers': layers[i_layers],
+        'error': error(i_dt, i_layers),
+        'n_evaluations': len(errors)
+    }
+
+
+if __name__ == '__main__':
+
+    # 壁体構成の定義
+    R = np.array([0.125, 0.750, 0.140, 0.050])  # 抵抗値
+    C = np.array([0.0, 0.75, 96.0, 0.0]) * 1000  # 容量値
+
+    grid = select_fdm_grid(R=R, C=C, tol=0.05,
+                           delta_ts=[60.0, 300.0, 600.0, 900.0, 1800.0, 3600.0], layers=list(range(1, 21)))
+    print(grid)
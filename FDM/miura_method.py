@@ -1,5 +1,6 @@
 import numpy as np
 from copy import copy
+from typing import Dict, List, Tuple
 from scipy import interpolate
 
 def miura_method(R: np.ndarray, C: np.ndarray, n_layers: int) -> (np.ndarray, np.ndarray):
@@ -51,6 +52,100 @@ def miura_method(R: np.ndarray, C: np.ndarray, n_layers: int) -> (np.ndarray, np
     return (virtual_R, virtual_C)
 
 
+def _interp_rows(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """行ごとに線形補間する（np.interpを行方向に並べたもの）
+
+    Args:
+        x (np.ndarray): 補間する点 (n_walls, n_x)
+        xp (np.ndarray): 単調増加（重複可）の既知点 (n_walls, n_xp)
+        fp (np.ndarray): 既知点の値 (n_walls, n_xp)
+
+    Returns:
+        np.ndarray: 補間値 (n_walls, n_x)
+    """
+
+    # np.interpと同じく xp[j] <= x < xp[j+1] となる区間jを使う（重複する点では右側の値、右端ではfpの最後の値）
+    j = np.sum(xp[:, np.newaxis, :] <= x[:, :, np.newaxis], axis=2) - 1
+    is_end = j >= xp.shape[1] - 1
+    j = np.minimum(j, xp.shape[1] - 2)
+
+    x_lo = np.take_along_axis(xp, j, axis=1)
+    x_hi = np.take_along_axis(xp, j + 1, axis=1)
+    f_lo = np.take_along_axis(fp, j, axis=1)
+    f_hi = np.take_along_axis(fp, j + 1, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = (f_hi - f_lo) / (x_hi - x_lo) * (x - x_lo) + f_lo
+
+    return np.where(is_end, fp[:, -1:], f)
+
+
+def miura_method_batch(R_list: List[np.ndarray], C_list: List[np.ndarray], layers: List[int]) \
+        -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """複数の壁体、複数の分割層数について三浦の方法による分割を一括で計算する（miura_methodの配列版）
+
+    Args:
+        R_list (List[np.ndarray]): 壁体ごとの熱抵抗[m2･K/W] （順序は室内側→室外側）
+        C_list (List[np.ndarray]): 壁体ごとの熱容量[J/K]
+        layers (List[int]): 後退差分で計算する壁体部分（表面熱伝達抵抗を除く）の分割層数
+
+    Returns:
+        Dict[int, Tuple[np.ndarray, np.ndarray]]: 分割層数ごとの
+            virtual_R (n_walls, n_layers + 2)、virtual_C (n_walls, n_layers + 1)
+    """
+
+    n_walls = len(R_list)
+    n_real = max(len(R) for R in R_list)
+
+    # 層数の異なる壁体は、累積値の最後の値を繰り返して揃える
+    real_accume_R = np.zeros((n_walls, n_real))
+    real_accume_RC = np.zeros((n_walls, n_real))
+    real_accume_C = np.zeros((n_walls, n_real))
+    R_si = np.zeros(n_walls)
+    R_so = np.zeros(n_walls)
+    for w, (R, C) in enumerate(zip(R_list, C_list)):
+        R = np.asarray(R, dtype=float)
+        C = np.asarray(C, dtype=float)
+        n = len(R)
+        real_R = copy(R)
+        real_R[0] = 0.0
+        real_R[n - 1] = 0.0
+        real_accume_R[w, :n] = np.cumsum(real_R)
+        real_accume_RC[w, :n] = np.cumsum(R * C)
+        real_accume_C[w, :n] = np.cumsum(C)
+        real_accume_R[w, n:] = real_accume_R[w, n - 1]
+        real_accume_RC[w, n:] = real_accume_RC[w, n - 1]
+        real_accume_C[w, n:] = real_accume_C[w, n - 1]
+        R_si[w] = R[0]
+        R_so[w] = R[n - 1]
+
+    rc_min = np.min(real_accume_RC, axis=1)
+    rc_max = np.max(real_accume_RC, axis=1)
+
+    networks = {}
+    for n_layers in layers:
+        # 差分計算する壁体構成の累積RCの計算
+        virtual_accume_RC = np.linspace(rc_min, rc_max, n_layers + 1, axis=1)
+        # RCでの線形補間
+        virtual_accume_R = _interp_rows(virtual_accume_RC, real_accume_RC, real_accume_R)
+        # 累積Rから仮想分割後の各層のRを計算し、室内、室外の熱抵抗を追加
+        virtual_R = np.concatenate(
+            [R_si[:, np.newaxis], np.diff(virtual_accume_R, axis=1), R_so[:, np.newaxis]], axis=1)
+
+        # 累積Rに相当する累積Cを線形補間から求める
+        virtual_accume_C = _interp_rows(virtual_accume_R, real_accume_R, real_accume_C)
+
+        # 差分計算する格子点の熱容量の設定
+        virtual_C = np.zeros((n_walls, n_layers + 1))
+        virtual_C[:, 1:n_layers] = (virtual_accume_C[:, 2:] - virtual_accume_C[:, :-2]) / 2.0
+        virtual_C[:, 0] = virtual_accume_C[:, 1] / 2.0
+        virtual_C[:, n_layers] = (virtual_accume_C[:, n_layers] - virtual_accume_C[:, n_layers-1]) / 2.0
+
+        networks[n_layers] = (virtual_R, virtual_C)
+
+    return networks
+
+
 if __name__ == "__main__":
 
     # 壁体構成の定義
@@ -61,3 +156,7 @@ if __name__ == "__main__":
     n_layers = 2
 
     virtual_R, virtual_C = miura_method(R=R, C=C, n_layers=n_layers)
+
+    # 複数の分割数をまとめて計算する
+    networks = miura_method_batch(R_list=[R], C_list=[C], layers=[2, 3, 5, 10])
+    print(networks[n_layers][0][0], networks[n_layers][1][0])
@@ -0,0 +1,271 @@
+import os
+import csv
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import response_factor as rf
+from wall_fdm import WallFDMSolver
+
+# 留数定理の根の計算方法（Numbaが使える場合はNumbaでコンパイルした関数を使う）
+try:
+    import numba
+    MATSUO_BACKEND = 'numba'
+except ImportError:
+    MATSUO_BACKEND = 'python'
+
+# 検証する壁体構成（室内側から）
+WALLS = [
+    {
+        'name': '1F床（木造）',
+        'R': [0.15, 0.022 / 0.16, 0.15 / 0.05, 0.04],
+        'C': [0.0, 720 * 0.022 * 1000, 13 * 0.15 * 1000, 0.0]
+    },
+    {
+        'name': '外壁（木造）',
+        'R': [0.11, 0.012 / 0.22, 0.1 / 0.05, 1 / 11.11, 0.009 / 0.16, 0.03 / 1.5, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 13 * 0.1 * 1000, 0.0, 720 * 0.009 * 1000, 1600 * 0.03 * 1000, 0.0]
+    },
+    {
+        'name': '2階天井（木造）',
+        'R': [0.09, 0.012 / 0.22, 0.2 / 0.05, 1 / 11.11, 0.012 / 0.16, 0.001 / 55, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 8 * 0.2 * 1000, 0.0, 720 * 0.012 * 1000, 3600 * 0.001 * 1000, 0.0]
+    },
+    {
+        'name': '間仕切',
+        'R': [0.11, 0.012 / 0.22, 1 / 11.11, 0.012 / 0.22, 0.11],
+        'C': [0.0, 830 * 0.012 * 1000, 0.0, 830 * 0.012 * 1000, 0.0]
+    },
+    {
+        'name': '屋根（RC）',
+        'R': [0.09, 0.012 / 0.22, 1 / 11.11, 0.05 / 0.028, 0.135 / 1.6, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 0.0, 40 * 0.05 * 1000, 0.135 * 2000 * 1000, 0.0]
+    },
+    {
+        'name': '外壁（RC）',
+        'R': [0.11, 0.012 / 0.22, 1 / 11.11, 0.05 / 0.028, 0.15 / 1.6, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 0.0, 0.05 * 40 * 1000, 0.15 * 2000 * 1000,  0.0]
+    },
+    {
+        'name': '床（RC）',
+        'R': [0.15, 0.022 / 0.16, 1 / 11.11, 0.13 / 1.6, 0.05 / 0.028, 0.04],
+        'C': [0.0, 720 * 0.022 * 1000, 0.0, 2000 * 0.13 * 1000, 40 * 0.05 * 1000, 0.0]
+    },
+    {
+        'name': '天井（木造）UA=0.2',
+        'R': [0.09, 0.01 / 0.22, 0.644 / 0.05, 0.04],
+        'C': [0.0, 830 * 0.01 * 1000, 8 * 0.01 * 1000, 0.0]
+    }
+]
+
+# 結果表の列
+RESULT_COLUMNS = [
+    'case', 'name', 'delta_t', 'n_layers', 'wall_index',
+    'rmse_a', 'rmse_a_24', 'rmse_t', 'rmse_t_24',
+    'mae_a', 'mae_a_24', 'mae_t', 'mae_t_24',
+    'rmse_periodic', 'mae_periodic',
+    'sum_q_fdm_pls', 'sum_q_fdm_mns', 'sum_q_rf_pls', 'sum_q_rf_mns'
+]
+
+
+def make_case_grid(delta_ts: List[float], layers: List[int], wall_indices: List[int],
+                   n_alpha_max: int = 200, n_days: int = 365) -> List[Dict]:
+    """計算ケースの一覧を作る
+
+    ケース番号は分割層数、時間間隔、壁体番号の順に入れ子にして振る（fig/case_*.pngと同じ）
+
+    Args:
+        delta_ts (List[float]): 時間間隔[s]
+        layers (List[int]): 壁体内の分割層数
+        wall_indices (List[int]): WALLSの壁体番号
+        n_alpha_max (int): 留数定理による根の数の最大値
+        n_days (int): 周期定常の検証で計算する日数
+
+    Returns:
+        List[Dict]: 計算ケース
+    """
+
+    cases = []
+    for n_layers in layers:
+        for delta_t in delta_ts:
+            for wall_index in wall_indices:
+                cases.append({
+                    'case': len(cases),
+                    'name': WALLS[wall_index]['name'],
+                    'delta_t': float(delta_t),
+                    'n_layers': int(n_layers),
+                    'wall_index': int(wall_index),
+                    'R': list(WALLS[wall_index]['R']),
+                    'C': list(WALLS[wall_index]['C']),
+                    'n_alpha_max': int(n_alpha_max),
+                    'n_days': int(n_days)
+                })
+
+    return cases
+
+
+def calc_case_key(case: Dict) -> str:
+    """計算条件から結果ファイルのキーを計算する
+
+    Args:
+        case (Dict): 計算ケース
+
+    Returns:
+        str: キー（SHA-256）
+    """
+
+    condition = {k: case[k] for k in ['delta_t', 'n_layers', 'R', 'C', 'n_alpha_max', 'n_days']}
+    return hashlib.sha256(json.dumps(condition, sort_keys=True).encode()).hexdigest()
+
+
+def run_case(case: Dict) -> Dict:
+    """1ケースについて後退差分法と応答係数法の熱流を比較する
+
+    Args:
+        case (Dict): 計算ケース
+
+    Returns:
+        Dict: ケースの条件と誤差指標
+    """
+
+    R = np.array(case['R'])
+    C = np.array(case['C'])
+    n_layers = case['n_layers']
+    delta_t = case['delta_t']
+
+    # 三浦の方法で分割した後退差分法
+    solver = WallFDMSolver.from_walls(R_list=[R], C_list=[C], n_layers=n_layers, delta_t=delta_t)
+
+    # 差分法による単位応答の計算（100時間分）
+    n_max = int(100 / (delta_t / 3600))
+    q_a, q_t = solver.calc_step_response(n_max=n_max)
+    q_a = q_a[0]
+    q_t = q_t[0]
+
+    # 留数定理での単位応答の計算
+    a0, aa, at, alpha = rf.calc_alpha_matsuo_method(rs=R, cs=C, i_max=case['n_alpha_max'], backend=MATSUO_BACKEND)
+    phi_a, phi_t = rf.calc_step_response_factor_matrix(aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+
+    # 周期定常（外気側sin、室内側cosの1日周期）の熱流の比較
+    time_angle = np.arange(start=0.0, stop=case['n_days'] + delta_t / 3600 / 24, step=delta_t / 3600 / 24)
+    theta_eo = np.sin(time_angle * (2 * np.pi))
+    theta_ei = np.cos(time_angle * (2 * np.pi))
+
+    q_fdm = solver.run(theta_ei=theta_ei, theta_eo=theta_eo)[0]
+
+    simulator_t = rf.WallResponseSimulator.from_roots(a0=a0, a=at, alpha=alpha, delta_t=delta_t)
+    simulator_a = rf.WallResponseSimulator.from_roots(a0=a0, a=aa, alpha=alpha, delta_t=delta_t)
+    q_rf = simulator_t.run(theta_eo)[0] - simulator_a.run(theta_ei)[0]
+
+    # 誤差指標の計算
+    n_24 = int(24 * 3600 / delta_t)
+    q_fdm_lastday = q_fdm[-n_24:]
+    q_rf_lastday = q_rf[-n_24:]
+
+    def rmse(x: np.ndarray, y: np.ndarray) -> float:
+        return float(np.sqrt(np.mean((x - y) ** 2)))
+
+    def mae(x: np.ndarray, y: np.ndarray) -> float:
+        return float(np.mean(np.abs(x - y)))
+
+    result = {k: case[k] for k in ['case', 'name', 'delta_t', 'n_layers', 'wall_index']}
+    result.update({
+        'rmse_a': rmse(phi_a, q_a),
+        'rmse_a_24': rmse(phi_a[n_24:], q_a[n_24:]),
+        'rmse_t': rmse(phi_t, q_t),
+        'rmse_t_24': rmse(phi_t[n_24:], q_t[n_24:]),
+        'mae_a': mae(phi_a, q_a),
+        'mae_a_24': mae(phi_a[n_24:], q_a[n_24:]),
+        'mae_t': mae(phi_t, q_t),
+        'mae_t_24': mae(phi_t[n_24:], q_t[n_24:]),
+        'rmse_periodic': rmse(q_rf_lastday, q_fdm_lastday),
+        'mae_periodic': mae(q_rf_lastday, q_fdm_lastday),
+        # 正値、負値ごとの最終日の積算熱量[kJ/m2]
+        'sum_q_fdm_pls': float(np.sum(q_fdm_lastday[q_fdm_lastday > 0]) * delta_t / 1000),
+        'sum_q_fdm_mns': float(np.sum(q_fdm_lastday[q_fdm_lastday < 0]) * delta_t / 1000),
+        'sum_q_rf_pls': float(np.sum(q_rf_lastday[q_rf_lastday > 0]) * delta_t / 1000),
+        'sum_q_rf_mns': float(np.sum(q_rf_lastday[q_rf_lastday < 0]) * delta_t / 1000)
+    })
+
+    return result
+
+
+def _run_case_cached(case: Dict, cache_path: str) -> Dict:
+    """1ケースを計算し、結果をJSONファイルに保存する"""
+
+    result = run_case(case)
+
+    # 一時ファイルに書いてから置き換える
+    fd, temp_path = tempfile.mkstemp(suffix='.json', dir=os.path.dirname(cache_path))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(temp_path, cache_path)
+
+    return result
+
+
+def run_parametric_study(cases: List[Dict], out_dir: str, max_workers: Optional[int] = None) -> List[Dict]:
+    """計算ケースをプロセスプールで並列に計算し、結果表をCSVファイルに書き出す
+
+    計算済みのケースは out_dir/cases に保存した結果を読み込み、再計算しない
+
+    Args:
+        cases (List[Dict]): 計算ケース（make_case_grid参照）
+        out_dir (str): 結果の保存先
+        max_workers (Optional[int]): プロセス数（Noneの場合はCPU数）
+
+    Returns:
+        List[Dict]: ケース番号順の結果
+    """
+
+    case_dir = os.path.join(out_dir, 'cases')
+    os.makedirs(case_dir, exist_ok=True)
+
+    results = {}
+    pending = []
+    for case in cases:
+        cache_path = os.path.join(case_dir, calc_case_key(case) + '.json')
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding='utf-8') as f:
+                result = json.load(f)
+            # ケース番号、名前は計算条件に含めないため、現在のケースに合わせる
+            result.update({k: case[k] for k in ['case', 'name', 'wall_index']})
+            results[case['case']] = result
+        else:
+            pending.append((case, cache_path))
+
+    if len(pending) > 0:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_run_case_cached, case, cache_path): case for case, cache_path in pending}
+            for future in as_completed(futures):
+                case = futures[future]
+                results[case['case']] = future.result()
+                print('case {0} done ({1}/{2})'.format(case['case'], len(results), len(cases)))
+
+    results = [results[case['case']] for case in cases]
+
+    # 結果表の書き出し
+    with open(os.path.join(out_dir, 'result.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({k: result[k] for k in RESULT_COLUMNS})
+
+    return results
+
+
+if __name__ == '__main__':
+
+    # 時間間隔[s]
+    delta_ts = [60.0, 300.0, 600.0, 900.0, 1800.0, 3600.0]
+    # 壁体内の分割数
+    layers = [2, 3, 5, 10]
+    # 壁体番号
+    wall_indices = list(range(len(WALLS)))
+
+    cases = make_case_grid(delta_ts=delta_ts, layers=layers, wall_indices=wall_indices)
+    run_parametric_study(cases=cases, out_dir='parametric_study')
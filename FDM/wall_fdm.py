@@ -0,0 +1,214 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+import miura_method as mm
+
+
+class WallFDMSolver:
+
+    """差分法（後退差分またはクランク・ニコルソン）により複数の壁体の室内表面熱流を時系列で計算する
+        三重対角行列をThomas法の係数として壁体ごとに1回だけ分解しておき、各時刻では前進消去と後退代入のみを行う
+        格子点温度を状態として保持するため、長い時系列を分割して順に与えてもよい
+    """
+
+    def __init__(self, virtual_R: np.ndarray, virtual_C: np.ndarray, delta_t: float, scheme: str = 'backward'):
+
+        """
+            virtual_R: 層間の熱抵抗（室内側表面熱伝達抵抗から室外側表面熱伝達抵抗まで）[m2 K/W] (n_walls, n_nodes + 1)
+            virtual_C: 格子点の熱容量[J/(m2 K)] (n_walls, n_nodes)
+                miura_methodの戻り値を壁体方向に重ねたもの（格子点数の異なる壁体は別に計算する）
+            delta_t: 計算の時間間隔[s]
+            scheme: 後退差分の場合は'backward'、クランク・ニコルソン法の場合は'crank_nicolson'
+        """
+
+        if scheme == 'backward':
+            theta_implicit = 1.0
+        elif scheme == 'crank_nicolson':
+            theta_implicit = 0.5
+        else:
+            raise ValueError("scheme must be 'backward' or 'crank_nicolson'")
+
+        virtual_R = np.atleast_2d(np.asarray(virtual_R, dtype=float))
+        virtual_C = np.atleast_2d(np.asarray(virtual_C, dtype=float))
+
+        self.delta_t = delta_t
+        self.scheme = scheme
+        self.n_walls, self.n_nodes = virtual_C.shape
+        # 室内側表面熱伝達抵抗[m2 K/W]
+        self.r_si = virtual_R[:, 0].copy()
+
+        # 格子点の時刻ごとの計算で壁体方向に連続となるよう(n_nodes, n_walls)で保持する
+        u_L = (delta_t / (virtual_C * virtual_R[:, :-1])).T
+        u_R = (delta_t / (virtual_C * virtual_R[:, 1:])).T
+        # 室内側、室外側の境界温度の係数
+        self.u_L0 = u_L[0].copy()
+        self.u_Rn = u_R[-1].copy()
+
+        # 陰解法側の三重対角行列 [I + theta K]
+        w = theta_implicit
+        lower = - w * u_L
+        diag = 1.0 + w * (u_L + u_R)
+        upper = - w * u_R
+        self._lower = lower
+
+        # 陽解法側の係数 [I - (1 - theta) K]（後退差分では単位行列）
+        self._w_explicit = 1.0 - w
+        self._u_L = u_L
+        self._u_R = u_R
+
+        # Thomas法の前進消去の係数
+        self._c_prime = np.zeros((self.n_nodes, self.n_walls))
+        self._inv_denom = np.zeros((self.n_nodes, self.n_walls))
+        denom = diag[0]
+        self._inv_denom[0] = 1.0 / denom
+        self._c_prime[0] = upper[0] / denom
+        for i in range(1, self.n_nodes):
+            denom = diag[i] - lower[i] * self._c_prime[i - 1]
+            self._inv_denom[i] = 1.0 / denom
+            self._c_prime[i] = upper[i] / denom
+
+        # 格子点温度[℃]
+        self.theta = np.zeros((self.n_nodes, self.n_walls))
+        # 前の時刻の境界温度[℃]（クランク・ニコルソン法で使う）
+        self._theta_ei_prev = np.zeros(self.n_walls)
+        self._theta_eo_prev = np.zeros(self.n_walls)
+
+    @classmethod
+    def from_walls(cls, R_list: List[np.ndarray], C_list: List[np.ndarray], n_layers: int, delta_t: float,
+                   scheme: str = 'backward') -> 'WallFDMSolver':
+
+        """壁体構成から三浦の方法で分割して作成する
+            R_list: 壁体ごとの熱抵抗（室内側から）[m2 K/W]
+            C_list: 壁体ごとの熱容量（室内側から）[J/(m2 K)]
+            n_layers: 壁体内の分割層数
+            delta_t: 計算の時間間隔[s]
+            scheme: 後退差分の場合は'backward'、クランク・ニコルソン法の場合は'crank_nicolson'
+        """
+
+        virtual_R, virtual_C = mm.miura_method_batch(R_list=R_list, C_list=C_list, layers=[n_layers])[n_layers]
+
+        return cls(virtual_R=virtual_R, virtual_C=virtual_C, delta_t=delta_t, scheme=scheme)
+
+    def reset(self) -> None:
+
+        """格子点温度、境界温度を0に戻す"""
+
+        self.theta[:] = 0.0
+        self._theta_ei_prev[:] = 0.0
+        self._theta_eo_prev[:] = 0.0
+
+    def _solve(self, d: np.ndarray) -> None:
+
+        """三重対角行列の連立方程式をThomas法で解く（dを解で上書きする）"""
+
+        lower = self._lower
+        c_prime = self._c_prime
+        inv_denom = self._inv_denom
+
+        # 前進消去
+        d[0] *= inv_denom[0]
+        for i in range(1, self.n_nodes):
+            d[i] -= lower[i] * d[i - 1]
+            d[i] *= inv_denom[i]
+
+        # 後退代入
+        for i in range(self.n_nodes - 2, -1, -1):
+            d[i] -= c_prime[i] * d[i + 1]
+
+    def run(self, theta_ei: np.ndarray, theta_eo: np.ndarray, theta_out: Optional[np.ndarray] = None) -> np.ndarray:
+
+        """室内側、室外側の境界温度の時系列を与えて室内表面熱流を計算する
+            theta_ei: 室内側の境界温度[℃] (n_walls, n_steps)、全壁体で共通の場合は(n_steps,)
+            theta_eo: 室外側の境界温度[℃] (n_walls, n_steps)、全壁体で共通の場合は(n_steps,)
+            theta_out: 室内側表面温度[℃]を書き込む配列 (n_walls, n_steps)（Noneの場合は書き込まない）
+
+        Returns:
+            q: 室内表面熱流（表面から室内側への熱流）[W/m2] (n_walls, n_steps)
+        """
+
+        theta_ei = self._to_step_major(theta_ei)
+        theta_eo = self._to_step_major(theta_eo)
+        n_steps = theta_ei.shape[0]
+
+        q = np.empty((n_steps, self.n_walls))
+        theta = self.theta
+        d = np.empty_like(theta)
+        w_e = self._w_explicit
+
+        for t in range(n_steps):
+            ei = theta_ei[t]
+            eo = theta_eo[t]
+
+            # 右辺の計算
+            d[:] = theta
+            if w_e > 0.0:
+                # 陽解法側 -(1 - theta) K theta^n と前の時刻の境界温度
+                d -= w_e * (self._u_L + self._u_R) * theta
+                d[1:] += w_e * self._u_L[1:] * theta[:-1]
+                d[:-1] += w_e * self._u_R[:-1] * theta[1:]
+                d[0] += w_e * self.u_L0 * self._theta_ei_prev
+                d[-1] += w_e * self.u_Rn * self._theta_eo_prev
+            d[0] += (1.0 - w_e) * self.u_L0 * ei
+            d[-1] += (1.0 - w_e) * self.u_Rn * eo
+
+            self._solve(d)
+            theta[:] = d
+
+            q[t] = (theta[0] - ei) / self.r_si
+            if theta_out is not None:
+                theta_out[:, t] = theta[0]
+
+            self._theta_ei_prev[:] = ei
+            self._theta_eo_prev[:] = eo
+
+        return q.T
+
+    def calc_step_response(self, n_max: int) -> Tuple[np.ndarray, np.ndarray]:
+
+        """単位応答を計算する（格子点温度は計算後に0に戻す）
+            n_max: 単位応答を計算する項数
+
+        Returns:
+            phi_a: 吸熱単位応答[W/(m2 K)] (n_walls, n_max)
+            phi_t: 貫流単位応答[W/(m2 K)] (n_walls, n_max)
+        """
+
+        ones = np.ones(n_max)
+        zeros = np.zeros(n_max)
+
+        # 室内側の温度を1とした場合に室内から壁体へ流れる熱流
+        self.reset()
+        phi_a = - self.run(theta_ei=ones, theta_eo=zeros)
+        # 室外側の温度を1とした場合に壁体から室内へ流れる熱流
+        self.reset()
+        phi_t = self.run(theta_ei=zeros, theta_eo=ones)
+        self.reset()
+
+        return phi_a, phi_t
+
+    def _to_step_major(self, theta: np.ndarray) -> np.ndarray:
+
+        """境界温度を(n_steps, n_walls)に揃える"""
+
+        theta = np.asarray(theta, dtype=float)
+        if theta.ndim == 1:
+            return np.broadcast_to(theta[:, np.newaxis], (len(theta), self.n_walls))
+        return np.ascontiguousarray(theta.T)
+
+
+if __name__ == "__main__":
+
+    # 壁体構成の定義
+    R = np.array([0.125, 0.750, 0.140, 0.050])  # 抵抗値
+    C = np.array([0.0, 0.75, 96.0, 0.0])  # 容量値
+
+    # 1時間間隔、1年分の外気側温度変化（室内側は0℃）
+    time_angle = np.arange(8760) / 24
+    theta_eo = np.sin(time_angle * (2 * np.pi))
+    theta_ei = np.zeros_like(theta_eo)
+
+    solver = WallFDMSolver.from_walls(R_list=[R], C_list=[C], n_layers=5, delta_t=3600.0)
+    # 1か月ずつに分けて計算する
+    q = np.concatenate([solver.run(theta_ei[i:i + 730], theta_eo[i:i + 730]) for i in range(0, 8760, 730)], axis=1)
+
+    print(q[0, -24:])
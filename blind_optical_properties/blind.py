@@ -1,4 +1,7 @@
 import math
+from typing import Tuple, Union
+
+import numpy as np
 
 def calc_blind_transmittance(slat_absorption: float, slat_spacing: float,
                              slat_width: float, profile_angle_rad: float,
@@ -71,6 +74,75 @@ def calc_blind_transmittance(slat_absorption: float, slat_spacing: float,
     return trance, r_z,  reflect
 
 
+def calc_blind_transmittance_array(slat_absorption: Union[float, np.ndarray], slat_spacing: Union[float, np.ndarray],
+                                   slat_width: Union[float, np.ndarray], profile_angle_rad: Union[float, np.ndarray],
+                                   slat_angle_rad: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ブラインドの透過率を配列で計算する（calc_blind_transmittanceの配列版）
+    引数はブロードキャストでき、プロファイル角、スラット角、スラットの寸法の組み合わせをまとめて計算する
+    be、ceが0.01以下の場合に形態係数を0とする分岐はマスクで扱う
+    :param slat_absorption: スラットの日射吸収率[－]
+    :param slat_spacing: スラット間隔[mm]
+    :param slat_width: スラット幅[mm]
+    :param profile_angle_rad: プロファイル角[rad]
+    :param slat_angle_rad: スラット角[rad]
+    :return: ブラインドの透過率、すきまを通る透過率、反射率[－]（引数をブロードキャストした形）
+    """
+
+    slat_absorption, slat_spacing, slat_width, profile_angle_rad, slat_angle_rad = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (slat_absorption, slat_spacing, slat_width, profile_angle_rad,
+                                               slat_angle_rad)])
+
+    # 三角関数の計算
+    sin_t = np.sin(slat_angle_rad)
+    cos_t = np.cos(slat_angle_rad)
+    tan_p = np.tan(profile_angle_rad)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        # 各部寸法の計算
+        ab = slat_spacing
+        bc = slat_width
+        cd = slat_spacing
+        ad = slat_width
+        be = np.minimum(slat_spacing / (cos_t * tan_p + sin_t), slat_width)
+        ce = np.maximum(bc - be, 0.0)
+        ac = np.sqrt((slat_width * cos_t) ** 2 + (slat_spacing - slat_width * sin_t) ** 2)
+        ae = np.sqrt((be * cos_t) ** 2 + (slat_spacing - be * sin_t) ** 2)
+        bd = np.sqrt((slat_width * cos_t) ** 2 + (slat_spacing + slat_width * sin_t) ** 2)
+        de = np.sqrt((slat_spacing * cos_t) ** 2 + (slat_spacing * sin_t + ce) ** 2)
+        l_gap = np.maximum(slat_spacing - slat_width * sin_t - slat_width * cos_t * tan_p, 0.0)
+        # z = slat_width * l_gap / (slat_spacing - l_gap) を代入して整理したもの
+        # （スラット角とプロファイル角がともに0で l_gap = slat_spacing となる場合も計算できる）
+        r_w = (slat_spacing - l_gap) / slat_spacing
+        r_z = l_gap / slat_spacing
+
+        # 面体面の形態係数の計算
+        F12 = ((bd + ae) - (ab + de)) / (2 * ad)
+        F13 = ((ac + de) - (ae + cd)) / (2 * ad)
+        F14 = ((ad + ab) - bd) / (2 * ad)
+        F15 = ((ad + cd) - ac) / (2 * ad)
+        is_be = be > 0.01
+        F21 = np.where(is_be, ((bd + ae) - (ab + de)) / (2 * be), 0.0)
+        F24 = np.where(is_be, ((ab + be) - ae) / (2 * be), 0.0)
+        F25 = np.where(is_be, np.maximum(((bc + de) - (bd + ce)) / (2 * be), 0.0), 0.0)
+        is_ce = ce > 0.01
+        F31 = np.where(is_ce, ((ac + de) - (ae + cd)) / (2 * ce), 0.0)
+        F34 = np.where(is_ce, ((bc + ae) - (be + ac)) / (2 * ce), 0.0)
+        F35 = np.where(is_ce, ((cd + ce) - de) / (2 * ce), 0.0)
+
+        a1 = 1.0 - slat_absorption
+        deno = 1.0 - a1 ** 2 * (F12 * F21 + F13 * F31)
+
+        q_4 = r_w * a1 * (a1 * F21 * F14 + deno * F24 + a1 ** 2 * F21 * (F12 * F24 + F13 * F34)) / deno
+        q_5 = r_w * a1 * (a1 * F21 * F15 + deno * F25 + a1 ** 2 * F21 * (F12 * F25 + F13 * F35)) / deno + r_z
+
+    trance = q_5
+    reflect = q_4
+
+    return trance, r_z, reflect
+
+
 if __name__ == '__main__':
 
     # 透過率、反射率の計算
@@ -80,3 +152,12 @@ if __name__ == '__main__':
     absorpt = max(1.0 - trance - reflect, 0.0)
 
     print(trance, absorpt, reflect)
+
+    # プロファイル角、スラット角の組み合わせをまとめて計算する場合
+    profile_angle_rad = np.radians(np.arange(-85.0, 90.0, 5.0))[:, np.newaxis]
+    slat_angle_rad = np.radians(np.arange(-80.0, 85.0, 5.0))[np.newaxis, :]
+    trance, tau_pass_through, reflect = calc_blind_transmittance_array(
+        slat_absorption=0.5, slat_width=25, slat_spacing=21.5,
+        profile_angle_rad=profile_angle_rad, slat_angle_rad=slat_angle_rad)
+
+    print(trance.shape, trance[19, 16], reflect[19, 16])
@@ -0,0 +1,315 @@
+import os
+import tempfile
+from functools import lru_cache
+from typing import Tuple, Union
+
+import numpy as np
+
+from blind import calc_blind_transmittance_array
+
+# 表のファイルの先頭の値（'BLND'のASCIIコード）、書式のバージョン、見出しの値の数
+BLIND_TABLE_MAGIC = float(0x424C4E44)
+BLIND_TABLE_VERSION = 3
+BLIND_TABLE_HEADER_SIZE = 16
+BLIND_TABLE_QUANTITIES = ['trance', 'tau_pass_through', 'reflect']
+
+# 誤差を確かめる、格子の1区間あたりの分割数
+_N_CHECK_DIVISIONS = 4
+
+
+class BlindTable:
+
+    """1つのブラインド製品（スラットの日射吸収率、間隔、幅）の透過率、反射率の表
+        プロファイル角とスラット角の等間隔の格子で calc_blind_transmittance_array の値を計算しておき、
+        格子の間は双線形補間で求める
+        表はファイルに保存してメモリマップで読み込むため、複数のプロセスで1つの表を共有できる
+        error_bound は格子の区間ごとの補間の誤差の上限（buildで計算する）
+    """
+
+    def __init__(self, slat_absorption: float, slat_spacing: float, slat_width: float,
+                 profile_angle_min_deg: float, profile_angle_step_deg: float,
+                 slat_angle_min_deg: float, slat_angle_step_deg: float,
+                 table: np.ndarray, error_bound: np.ndarray):
+
+        """
+            slat_absorption: スラットの日射吸収率[－]
+            slat_spacing: スラット間隔[mm]
+            slat_width: スラット幅[mm]
+            profile_angle_min_deg: 表のプロファイル角の下限[deg]
+            profile_angle_step_deg: 表のプロファイル角の間隔[deg]
+            slat_angle_min_deg: 表のスラット角の下限[deg]
+            slat_angle_step_deg: 表のスラット角の間隔[deg]
+            table: 透過率、すきまを通る透過率、反射率の表[－] (3, プロファイル角の数, スラット角の数)
+            error_bound: 格子の区間ごとの双線形補間の誤差の上限[－] (3, プロファイル角の数 - 1, スラット角の数 - 1)
+        """
+
+        self.slat_absorption = slat_absorption
+        self.slat_spacing = slat_spacing
+        self.slat_width = slat_width
+        self.profile_angle_min_deg = profile_angle_min_deg
+        self.profile_angle_step_deg = profile_angle_step_deg
+        self.slat_angle_min_deg = slat_angle_min_deg
+        self.slat_angle_step_deg = slat_angle_step_deg
+        self.table = table
+        self.error_bound = error_bound
+        _, self.n_profile_angles, self.n_slat_angles = table.shape
+
+    @property
+    def max_error(self) -> np.ndarray:
+
+        """双線形補間の誤差の上限の、式が有効な区間での最大値（透過率、すきまを通る透過率、反射率）[－] (3,)"""
+
+        return np.nanmax(self.error_bound, axis=(1, 2)).astype(float)
+
+    @property
+    def profile_angle_max_deg(self) -> float:
+
+        """表のプロファイル角の上限[deg]"""
+
+        return self.profile_angle_min_deg + self.profile_angle_step_deg * (self.n_profile_angles - 1)
+
+    @property
+    def slat_angle_max_deg(self) -> float:
+
+        """表のスラット角の上限[deg]"""
+
+        return self.slat_angle_min_deg + self.slat_angle_step_deg * (self.n_slat_angles - 1)
+
+    @classmethod
+    def build(cls, slat_absorption: float, slat_spacing: float, slat_width: float,
+              profile_angle_range_deg: Tuple[float, float] = (0.0, 89.0), profile_angle_step_deg: float = 1.0,
+              slat_angle_range_deg: Tuple[float, float] = (-90.0, 90.0), slat_angle_step_deg: float = 1.0) \
+            -> 'BlindTable':
+
+        """表を計算する（ファイルには保存しない）
+            slat_absorption: スラットの日射吸収率[－]
+            slat_spacing: スラット間隔[mm]
+            slat_width: スラット幅[mm]
+            profile_angle_range_deg: 表のプロファイル角の下限、上限[deg]
+                （直達日射のプロファイル角は0°以上で、90°ではtanが発散するため、既定の範囲は0°～89°）
+            profile_angle_step_deg: 表のプロファイル角の間隔[deg]
+            slat_angle_range_deg: 表のスラット角の下限、上限[deg]
+            slat_angle_step_deg: 表のスラット角の間隔[deg]
+            プロファイル角とスラット角の和が負の場合は式が有効でない（スラットの裏側から日射が入る）ため、
+            その格子点の値をnanとする（nanの格子点を含む区間では lookup と error_bound もnanとなる）
+        """
+
+        # 格子は上限を超えない範囲とする（範囲が間隔で割り切れない場合、表の上限は指定した上限より小さい）
+        n_p = int(np.floor(
+            (profile_angle_range_deg[1] - profile_angle_range_deg[0]) / profile_angle_step_deg + 1.0e-9)) + 1
+        n_s = int(np.floor(
+            (slat_angle_range_deg[1] - slat_angle_range_deg[0]) / slat_angle_step_deg + 1.0e-9)) + 1
+        if n_p < 2 or n_s < 2:
+            raise ValueError('the table needs at least 2 profile angles and 2 slat angles')
+
+        def calc(profile_angle_deg: np.ndarray, slat_angle_deg: np.ndarray) -> np.ndarray:
+            value = np.stack(calc_blind_transmittance_array(
+                slat_absorption=slat_absorption, slat_spacing=slat_spacing, slat_width=slat_width,
+                profile_angle_rad=np.radians(profile_angle_deg), slat_angle_rad=np.radians(slat_angle_deg)))
+            return np.where(profile_angle_deg + slat_angle_deg >= - 1.0e-9, value, np.nan)
+
+        profile_angle_deg = profile_angle_range_deg[0] + profile_angle_step_deg * np.arange(n_p)
+        slat_angle_deg = slat_angle_range_deg[0] + slat_angle_step_deg * np.arange(n_s)
+        table = calc(profile_angle_deg[:, np.newaxis], slat_angle_deg[np.newaxis, :]).astype(np.float32)
+
+        blind_table = cls(slat_absorption=slat_absorption, slat_spacing=slat_spacing, slat_width=slat_width,
+                          profile_angle_min_deg=profile_angle_range_deg[0],
+                          profile_angle_step_deg=profile_angle_step_deg,
+                          slat_angle_min_deg=slat_angle_range_deg[0], slat_angle_step_deg=slat_angle_step_deg,
+                          table=table, error_bound=np.zeros((3, n_p - 1, n_s - 1), dtype=np.float32))
+
+        # 格子の各区間を_N_CHECK_DIVISIONS分割した点（確かめる点）で補間の誤差 e を確かめる（float32に丸めた誤差を含む）
+        # 区間内では補間は各軸について1次式のため、確かめる点の間の誤差は e の補間と、式を確かめる点で補間した
+        # ときの誤差の和以下となる（後者は傾きの折れが各軸1つまでなら、確かめる点の2階差分の和の1/2以下）
+        # 式が不連続な区間（be、ce ≦ 0.01 の分岐）や確かめる点の間隔より細かい変化がある区間では上限とならない
+        d = _N_CHECK_DIVISIONS
+        p_check = profile_angle_range_deg[0] + profile_angle_step_deg * np.arange((n_p - 1) * d + 1) / d
+        s_check = slat_angle_range_deg[0] + slat_angle_step_deg * np.arange((n_s - 1) * d + 1) / d
+        exact = calc(p_check[:, np.newaxis], s_check[np.newaxis, :])
+
+        # 確かめる点の2階差分（端の点は隣の点の値とし、式が有効でない点を使う差分は除く）
+        d2_p = np.pad(np.abs(np.diff(exact, 2, axis=1)), ((0, 0), (1, 1), (0, 0)), mode='edge')
+        d2_s = np.pad(np.abs(np.diff(exact, 2, axis=2)), ((0, 0), (0, 0), (1, 1)), mode='edge')
+        d2_p = np.where(np.isnan(d2_p), 0.0, d2_p)
+        d2_s = np.where(np.isnan(d2_s), 0.0, d2_s)
+
+        def cell_window(a: np.ndarray) -> np.ndarray:
+            # 格子の区間ごとの、区間の境界を含む (d + 1) × (d + 1) 点 (3, n_p - 1, n_s - 1, d + 1, d + 1)
+            return np.lib.stride_tricks.sliding_window_view(a, (d + 1, d + 1), axis=(1, 2))[:, ::d, ::d]
+
+        # 区間の4隅の値から確かめる点を補間する（区間の境界の点も隣の区間の値を使わない）
+        t = table.astype(float)[:, :, :, np.newaxis, np.newaxis]
+        u = (np.arange(d + 1) / d)[:, np.newaxis]
+        v = (np.arange(d + 1) / d)[np.newaxis, :]
+        interpolated = (1.0 - u) * ((1.0 - v) * t[:, :-1, :-1] + v * t[:, :-1, 1:]) \
+            + u * ((1.0 - v) * t[:, 1:, :-1] + v * t[:, 1:, 1:])
+        error = np.abs(interpolated - cell_window(exact))
+
+        # 式が有効でない点を含む区間は e がnanとなるため、上限もnanとなる
+        error_bound = np.max(error, axis=(-2, -1)) \
+            + (np.max(cell_window(d2_p), axis=(-2, -1)) + np.max(cell_window(d2_s), axis=(-2, -1))) / 2.0
+        # float32に丸めるときに上限が小さくならないよう切り上げる
+        error_bound32 = error_bound.astype(np.float32)
+        blind_table.error_bound = np.where(
+            error_bound32 < error_bound, np.nextafter(error_bound32, np.float32(np.inf)), error_bound32)
+
+        return blind_table
+
+    def save(self, file_path: str) -> None:
+
+        """表をファイルに保存する（一時ファイルに書いてから置き換える）
+            file_path: 保存するファイルのパス
+        """
+
+        # 先頭にfloat64の見出し、続いてfloat32の表 (3, プロファイル角の数, スラット角の数) と
+        # 誤差の上限 (3, プロファイル角の数 - 1, スラット角の数 - 1)（1番目の軸はBLIND_TABLE_QUANTITIESの順）
+        header = np.zeros(BLIND_TABLE_HEADER_SIZE)
+        header[:11] = [
+            BLIND_TABLE_MAGIC, BLIND_TABLE_VERSION,
+            self.slat_absorption, self.slat_spacing, self.slat_width,
+            self.profile_angle_min_deg, self.profile_angle_step_deg, self.n_profile_angles,
+            self.slat_angle_min_deg, self.slat_angle_step_deg, self.n_slat_angles]
+
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(os.path.abspath(file_path)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header.astype('<f8').tobytes())
+                f.write(np.ascontiguousarray(self.table, dtype='<f4').tobytes())
+                f.write(np.ascontiguousarray(self.error_bound, dtype='<f4').tobytes())
+            os.replace(temp_path, file_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, file_path: str) -> 'BlindTable':
+
+        """保存した表をメモリマップで読み込む（同じファイルはプロセス内で1回だけ開く）
+            file_path: 読み込むファイルのパス
+        """
+
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+
+        return _load_blind_table(file_path, stat.st_size, stat.st_mtime_ns)
+
+    def lookup(self, profile_angle_rad: Union[float, np.ndarray], slat_angle_rad: Union[float, np.ndarray]) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+        """表から双線形補間で透過率、反射率を求める
+            表の範囲外の角度と、値がnanの格子点を含む区間の角度はnanとする
+            profile_angle_rad: プロファイル角[rad]
+            slat_angle_rad: スラット角[rad]（プロファイル角とブロードキャストできる形）
+
+        Returns:
+            ブラインドの透過率、すきまを通る透過率、反射率[－]（引数をブロードキャストした形）
+        """
+
+        i, u, j, v, is_inside = self._locate(profile_angle_rad, slat_angle_rad)
+
+        table = self.table
+        result = []
+        for k in range(len(BLIND_TABLE_QUANTITIES)):
+            t = table[k]
+            result.append(np.where(is_inside, (1.0 - u) * ((1.0 - v) * t[i, j] + v * t[i, j + 1])
+                                   + u * ((1.0 - v) * t[i + 1, j] + v * t[i + 1, j + 1]), np.nan))
+
+        return result[0], result[1], result[2]
+
+    def lookup_error_bound(self, profile_angle_rad: Union[float, np.ndarray],
+                           slat_angle_rad: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+        """lookupで求めた値の誤差の上限（角度が含まれる格子の区間の error_bound）
+            表の範囲外の角度と、値がnanの格子点を含む区間の角度はnanとする
+            profile_angle_rad: プロファイル角[rad]
+            slat_angle_rad: スラット角[rad]（プロファイル角とブロードキャストできる形）
+
+        Returns:
+            透過率、すきまを通る透過率、反射率の誤差の上限[－]（引数をブロードキャストした形）
+        """
+
+        i, _, j, _, is_inside = self._locate(profile_angle_rad, slat_angle_rad)
+
+        error_bound = [np.where(is_inside, self.error_bound[k][i, j], np.nan)
+                       for k in range(len(BLIND_TABLE_QUANTITIES))]
+
+        return error_bound[0], error_bound[1], error_bound[2]
+
+    def _locate(self, profile_angle_rad: Union[float, np.ndarray], slat_angle_rad: Union[float, np.ndarray]) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+        """角度が含まれる格子の区間の番号と区間内の位置（0～1）、表の範囲内かどうかを求める"""
+
+        def position(angle_rad: np.ndarray, angle_min_deg: float, step_deg: float, n: int) \
+                -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            x = (np.degrees(angle_rad) - angle_min_deg) / step_deg
+            # 丸め誤差で範囲の端をわずかに超えた値は範囲内とする（nanは範囲外）
+            is_inside = (x >= - 1.0e-9) & (x <= n - 1 + 1.0e-9)
+            x = np.where(is_inside, np.clip(x, 0.0, n - 1), 0.0)
+            i = np.minimum(x.astype(int), n - 2)
+            return i, x - i, is_inside
+
+        i, u, is_inside_p = position(np.asarray(profile_angle_rad, dtype=float), self.profile_angle_min_deg,
+                                     self.profile_angle_step_deg, self.n_profile_angles)
+        j, v, is_inside_s = position(np.asarray(slat_angle_rad, dtype=float), self.slat_angle_min_deg,
+                                     self.slat_angle_step_deg, self.n_slat_angles)
+
+        return np.broadcast_arrays(i, u, j, v, is_inside_p & is_inside_s)
+
+
+@lru_cache(maxsize=256)
+def _load_blind_table(file_path: str, size: int, mtime_ns: int) -> BlindTable:
+
+    """ファイルの大きさ、更新時刻ごとに読み込んだ表をプロセス内で保持する"""
+
+    # ファイルの書式はBlindTable.saveを参照
+    header = np.fromfile(file_path, dtype='<f8', count=BLIND_TABLE_HEADER_SIZE)
+    if len(header) < BLIND_TABLE_HEADER_SIZE or header[0] != BLIND_TABLE_MAGIC \
+            or int(header[1]) != BLIND_TABLE_VERSION:
+        raise ValueError('{0} is not a blind table file (version {1})'.format(file_path, BLIND_TABLE_VERSION))
+
+    n_p = int(header[7])
+    n_s = int(header[10])
+    if size != BLIND_TABLE_HEADER_SIZE * 8 + 3 * (n_p * n_s + (n_p - 1) * (n_s - 1)) * 4:
+        raise ValueError('{0} is truncated'.format(file_path))
+
+    offset = BLIND_TABLE_HEADER_SIZE * 8
+    table = np.memmap(file_path, dtype='<f4', mode='r', offset=offset, shape=(3, n_p, n_s))
+    error_bound = np.memmap(file_path, dtype='<f4', mode='r', offset=offset + 3 * n_p * n_s * 4,
+                            shape=(3, n_p - 1, n_s - 1))
+
+    return BlindTable(slat_absorption=header[2], slat_spacing=header[3], slat_width=header[4],
+                      profile_angle_min_deg=header[5], profile_angle_step_deg=header[6],
+                      slat_angle_min_deg=header[8], slat_angle_step_deg=header[9],
+                      table=table, error_bound=error_bound)
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # スラット幅25mm、間隔21.5mm、日射吸収率0.5のブラインド
+    blind_table = BlindTable.build(slat_absorption=0.5, slat_spacing=21.5, slat_width=25.0)
+    print('max error:', dict(zip(BLIND_TABLE_QUANTITIES, blind_table.max_error)))
+
+    file_path = os.path.join(tempfile.gettempdir(), 'blind_table.bin')
+    blind_table.save(file_path)
+    blind_table = BlindTable.load(file_path)
+
+    # 1年間の1時間ごとのプロファイル角、スラット角
+    rng = np.random.default_rng(0)
+    profile_angle_rad = np.radians(rng.uniform(0.0, 89.0, 8760))
+    slat_angle_rad = np.radians(rng.uniform(-90.0, 90.0, 8760))
+
+    start = time.perf_counter()
+    trance, tau_pass_through, reflect = blind_table.lookup(profile_angle_rad, slat_angle_rad)
+    print('lookup: {0:.4f} s'.format(time.perf_counter() - start))
+
+    exact = calc_blind_transmittance_array(slat_absorption=0.5, slat_spacing=21.5, slat_width=25.0,
+                                           profile_angle_rad=profile_angle_rad, slat_angle_rad=slat_angle_rad)
+    error = np.abs(np.stack((trance, tau_pass_through, reflect)) - np.stack(exact))
+    error_bound = np.stack(blind_table.lookup_error_bound(profile_angle_rad, slat_angle_rad))
+    is_valid = ~np.isnan(trance)
+    print('valid:', np.mean(is_valid))
+    print('error <= error_bound:', np.all(error[:, is_valid] <= error_bound[:, is_valid], axis=1))
@@ -0,0 +1,297 @@
+import time
+import tempfile
+import numpy as np
+
+import response_factor as rf
+
+# 検証用の壁体構成（室内側から）
+WALLS = [
+    {
+        'name': '1F床（木造）',
+        'R': [0.15, 0.022 / 0.16, 0.15 / 0.05, 0.04],
+        'C': [0.0, 720 * 0.022 * 1000, 13 * 0.15 * 1000, 0.0]
+    },
+    {
+        'name': '外壁（木造）',
+        'R': [0.11, 0.012 / 0.22, 0.1 / 0.05, 1 / 11.11, 0.009 / 0.16, 0.03 / 1.5, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 13 * 0.1 * 1000, 0.0, 720 * 0.009 * 1000, 1600 * 0.03 * 1000, 0.0]
+    },
+    {
+        'name': '間仕切',
+        'R': [0.11, 0.012 / 0.22, 1 / 11.11, 0.012 / 0.22, 0.11],
+        'C': [0.0, 830 * 0.012 * 1000, 0.0, 830 * 0.012 * 1000, 0.0]
+    },
+    {
+        'name': '屋根（RC）',
+        'R': [0.09, 0.012 / 0.22, 1 / 11.11, 0.05 / 0.028, 0.135 / 1.6, 0.04],
+        'C': [0.0, 830 * 0.012 * 1000, 0.0, 40 * 0.05 * 1000, 0.135 * 2000 * 1000, 0.0]
+    },
+    {
+        'name': '外壁（RC）',
+        'R': [0.11, 0.05 / 1.6, 0.04],
+        'C': [0.0, 2000.0 * 0.05 * 1000.0, 0.0]
+    },
+]
+
+
+def make_walls(n_walls: int, seed: int = 0) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """検証用の壁体構成を厚さを変えながらn_walls個作る
+
+    Args:
+        n_walls (int): 壁体数
+        seed (int): 乱数のシード
+
+    Returns:
+        tuple[list[np.ndarray], list[np.ndarray]]: 熱抵抗[m2 K/W]、熱容量[J/(m2 K)]のリスト
+    """
+
+    rng = np.random.default_rng(seed)
+    rs_list = []
+    cs_list = []
+    for w in range(n_walls):
+        wall = WALLS[w % len(WALLS)]
+        scale = rng.uniform(0.5, 2.0, len(wall['R']))
+        # 表面熱伝達抵抗は変えない
+        scale[0] = 1.0
+        scale[-1] = 1.0
+        rs_list.append(np.array(wall['R']) * scale)
+        cs_list.append(np.array(wall['C']) * scale)
+
+    return rs_list, cs_list
+
+
+def bench_matsuo_batch(n_walls: int = 200, i_max: int = 15) -> None:
+    """calc_alpha_matsuo_methodの逐次計算と一括計算の処理速度を比較する
+
+    Args:
+        n_walls (int): 壁体数
+        i_max (int): 根を探索する上限数
+    """
+
+    rs_list, cs_list = make_walls(n_walls)
+
+    start = time.perf_counter()
+    results = [rf.calc_alpha_matsuo_method(rs=r, cs=c, i_max=i_max) for r, c in zip(rs_list, cs_list)]
+    t_loop = time.perf_counter() - start
+
+    rs, cs = rf.stack_walls(rs_list, cs_list)
+    start = time.perf_counter()
+    a0, aa, at, alpha = rf.calc_alpha_matsuo_method_batch(rs=rs, cs=cs, i_max=i_max)
+    t_batch = time.perf_counter() - start
+
+    # 逐次計算と同じ根が得られることの確認
+    for w, (a0_w, aa_w, at_w, alpha_w) in enumerate(results):
+        np.testing.assert_allclose(a0[w], a0_w, rtol=1e-12)
+        np.testing.assert_allclose(alpha[w], alpha_w, rtol=1e-10)
+        np.testing.assert_allclose(at[w], at_w, rtol=1e-10)
+        np.testing.assert_allclose(aa[w], aa_w, rtol=1e-10, atol=1e-12 * np.max(np.abs(aa_w)))
+
+    print('calc_alpha_matsuo_method ({0} walls, i_max={1})'.format(n_walls, i_max))
+    print('  loop : {0:10.1f} walls/s'.format(n_walls / t_loop))
+    print('  batch: {0:10.1f} walls/s'.format(n_walls / t_batch))
+
+
+def bench_response_factor_cache(n_walls: int = 500, i_max: int = 15, delta_t: float = 3600.0) -> None:
+    """応答係数キャッシュの有無による処理時間を比較する
+
+    Args:
+        n_walls (int): 壁体数
+        i_max (int): 根を探索する上限数
+        delta_t (float): 応答係数を計算する時間間隔[s]
+    """
+
+    rs_list, cs_list = make_walls(n_walls)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+
+        # 初回（根の計算とファイルへの保存）
+        start = time.perf_counter()
+        for r, c in zip(rs_list, cs_list):
+            rf.load_response_factor(rs=r, cs=c, i_max=i_max, delta_t=delta_t, cache_dir=cache_dir)
+        t_cold = time.perf_counter() - start
+
+        # 別プロセスの起動直後を想定してプロセス内のキャッシュを消す
+        rf.clear_response_factor_memory_cache()
+        start = time.perf_counter()
+        for r, c in zip(rs_list, cs_list):
+            rf.load_response_factor(rs=r, cs=c, i_max=i_max, delta_t=delta_t, cache_dir=cache_dir)
+        t_disk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for r, c in zip(rs_list, cs_list):
+            rf.load_response_factor(rs=r, cs=c, i_max=i_max, delta_t=delta_t, cache_dir=cache_dir)
+        t_memory = time.perf_counter() - start
+
+    print('load_response_factor ({0} walls)'.format(n_walls))
+    print('  compute: {0:8.3f} s'.format(t_cold))
+    print('  disk   : {0:8.3f} s'.format(t_disk))
+    print('  memory : {0:8.3f} s'.format(t_memory))
+
+
+def bench_response_factor_matrix(n_max: int = 10 ** 4, delta_t: float = 60.0) -> None:
+    """単位応答、二等辺三角波励振の応答係数の逐次計算と配列計算を比較する
+
+    Args:
+        n_max (int): 応答係数を計算する項数
+        delta_t (float): 応答係数を計算する時間間隔[s]
+    """
+
+    wall = WALLS[3]
+    a0, aa, at, alpha = rf.calc_alpha_matsuo_method(rs=np.array(wall['R']), cs=np.array(wall['C']), i_max=15)
+
+    start = time.perf_counter()
+    phi_a, phi_t = rf.calc_step_respose_factor(aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+    rft_a, rft_t, _, _, _ = rf.calc_triangle_response_factor(
+        aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    phi_a_m, phi_t_m = rf.calc_step_response_factor_matrix(
+        aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+    rft_a_m, rft_t_m = rf.calc_triangle_response_factor_matrix(
+        aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+    t_matrix = time.perf_counter() - start
+
+    # 逐次計算と同じ応答係数が得られることの確認
+    np.testing.assert_allclose(phi_a_m, phi_a, rtol=1e-12, atol=1e-12 * abs(phi_a[0]))
+    np.testing.assert_allclose(phi_t_m, phi_t, rtol=1e-12, atol=1e-12 * abs(a0))
+    np.testing.assert_allclose(rft_a_m, rft_a, rtol=1e-12, atol=1e-12 * abs(rft_a[0]))
+    np.testing.assert_allclose(rft_t_m, rft_t, rtol=1e-12, atol=1e-12 * abs(rft_t[0]))
+
+    # 複数の時間間隔の一括計算
+    delta_ts = np.array([60.0, 300.0, 600.0, 900.0, 1800.0, 3600.0])
+    start = time.perf_counter()
+    rft_a_dt, rft_t_dt = rf.calc_triangle_response_factor_matrix(
+        aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_ts)
+    t_matrix_dt = time.perf_counter() - start
+    for k, dt in enumerate(delta_ts):
+        rft_a_k, rft_t_k, _, _, _ = rf.calc_triangle_response_factor(
+            aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=dt)
+        np.testing.assert_allclose(rft_t_dt[k], rft_t_k, rtol=1e-12, atol=1e-12 * abs(rft_t_k[0]))
+
+    print('step + triangle response factor (n_max={0})'.format(n_max))
+    print('  loop  : {0:8.4f} s'.format(t_loop))
+    print('  matrix: {0:8.4f} s'.format(t_matrix))
+    print('  matrix ({0} delta_t): {1:8.4f} s'.format(len(delta_ts), t_matrix_dt))
+
+
+def bench_wall_response_simulator(n_walls: int = 1000, n_steps: int = 8760, delta_t: float = 3600.0) -> None:
+    """WallResponseSimulatorによる室内表面熱流の計算速度を計測する
+
+    Args:
+        n_walls (int): 壁体数
+        n_steps (int): 計算するステップ数
+        delta_t (float): 計算の時間間隔[s]
+    """
+
+    rs_list, cs_list = make_walls(n_walls)
+    simulator = rf.WallResponseSimulator.from_walls(rs_list=rs_list, cs_list=cs_list, delta_t=delta_t)
+
+    rng = np.random.default_rng(0)
+    theta = rng.uniform(-5.0, 35.0, (n_walls, n_steps))
+
+    # 1年分を1か月ずつに分けて与える
+    n_chunk = n_steps // 12
+    start = time.perf_counter()
+    for i in range(0, n_steps, n_chunk):
+        simulator.run(theta[:, i:i + n_chunk])
+    t_run = time.perf_counter() - start
+
+    print('WallResponseSimulator ({0} walls x {1} steps, {2} terms)'.format(n_walls, n_steps, simulator.n_terms))
+    print('  {0:8.3f} s, {1:10.3e} wall-steps/s'.format(t_run, n_walls * n_steps / t_run))
+
+
+def bench_matsuo_numba(layers: tuple[int, ...] = (2, 3, 5, 10, 20), n_walls: int = 20, i_max: int = 15) -> None:
+    """calc_alpha_matsuo_methodのpython版とnumba版の処理速度を層数別に比較する
+
+    Args:
+        layers (tuple[int, ...]): 比較する層数（表面熱伝達抵抗を除く）
+        n_walls (int): 層数ごとの壁体数
+        i_max (int): 根を探索する上限数
+    """
+
+    rng = np.random.default_rng(0)
+
+    # コンパイル時間を計測に含めない
+    rf.calc_alpha_matsuo_method(
+        rs=np.array(WALLS[0]['R']), cs=np.array(WALLS[0]['C']), i_max=i_max, backend='numba')
+
+    print('calc_alpha_matsuo_method python vs numba ({0} walls per layer count, i_max={1})'.format(n_walls, i_max))
+    for n_layers in layers:
+        # 室内外の表面熱伝達抵抗の間にコンクリート、断熱材相当の層を置く
+        rs_list = []
+        cs_list = []
+        for w in range(n_walls):
+            rs = rng.uniform(0.01, 1.0, n_layers + 2)
+            cs = rng.uniform(1.0e4, 3.0e5, n_layers + 2)
+            rs[0], rs[-1] = 0.11, 0.04
+            cs[0], cs[-1] = 0.0, 0.0
+            rs_list.append(rs)
+            cs_list.append(cs)
+
+        start = time.perf_counter()
+        results = [rf.calc_alpha_matsuo_method(rs=r, cs=c, i_max=i_max) for r, c in zip(rs_list, cs_list)]
+        t_python = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results_numba = [rf.calc_alpha_matsuo_method(rs=r, cs=c, i_max=i_max, backend='numba')
+                         for r, c in zip(rs_list, cs_list)]
+        t_numba = time.perf_counter() - start
+
+        # python版と同じ根、留数が得られることの確認
+        for (_, aa, at, alpha), (_, aa_n, at_n, alpha_n) in zip(results, results_numba):
+            np.testing.assert_allclose(alpha_n, alpha, rtol=1e-10)
+            np.testing.assert_allclose(aa_n, aa, rtol=1e-10)
+            np.testing.assert_allclose(at_n, at, rtol=1e-10)
+
+        print('  {0:2d} layers: python {1:10.1f} walls/s, numba {2:10.1f} walls/s'.format(
+            n_layers, n_walls / t_python, n_walls / t_numba))
+
+
+def bench_matsuo_adaptive(delta_ts: tuple[float, ...] = (60.0, 900.0, 3600.0), tols: tuple[float, ...] = (1.0e-3, 1.0e-4),
+                          i_ref: int = 1000) -> None:
+    """calc_alpha_matsuo_method_adaptiveで打ち切った根による応答係数の誤差がtol以下であることを確かめる
+
+    誤差は、i_ref個の根による二等辺三角波励振の応答係数との差の絶対値の合計を熱貫流率で割った値とする
+
+    Args:
+        delta_ts (tuple[float, ...]): 応答係数を計算する時間間隔[s]
+        tols (tuple[float, ...]): 打ち切りの許容値
+        i_ref (int): 比較の基準とする根の数
+    """
+
+    n_max = 500
+
+    print('calc_alpha_matsuo_method_adaptive (error / tol, reference {0} roots)'.format(i_ref))
+    for wall in WALLS:
+        rs = np.array(wall['R'])
+        cs = np.array(wall['C'])
+        a0, aa, at, alpha = rf.calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=i_ref, backend='numba')
+        for delta_t in delta_ts:
+            rft_a, rft_t = rf.calc_triangle_response_factor_matrix(
+                aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+            for tol in tols:
+                start = time.perf_counter()
+                a0_n, aa_n, at_n, alpha_n = rf.calc_alpha_matsuo_method_adaptive(
+                    rs=rs, cs=cs, delta_t=delta_t, tol=tol, backend='numba')
+                t_adaptive = time.perf_counter() - start
+                rft_a_n, rft_t_n = rf.calc_triangle_response_factor_matrix(
+                    aa=aa_n, at=at_n, alpha=alpha_n, a0=a0_n, n_max=n_max, delta_t=delta_t)
+                error_a = np.sum(np.abs(rft_a_n - rft_a)) / a0
+                error_t = np.sum(np.abs(rft_t_n - rft_t)) / a0
+
+                # 打ち切りによる誤差がtol以下であることの確認
+                assert error_a <= tol and error_t <= tol, (wall['name'], delta_t, tol, error_a, error_t)
+
+                print('  {0}: delta_t={1:6.0f} s, tol={2:.0e}, {3:4d} roots, a {4:.3f}, t {5:.3f}, {6:.3f} s'.format(
+                    wall['name'], delta_t, tol, len(alpha_n), error_a / tol, error_t / tol, t_adaptive))
+
+
+if __name__ == '__main__':
+
+    bench_matsuo_batch()
+    bench_response_factor_cache()
+    bench_response_factor_matrix()
+    bench_wall_response_simulator()
+    bench_matsuo_numba()
+    bench_matsuo_adaptive()
@@ -1,59 +1,49 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING, List
 
 import response_factor as rf
+import wdc_reader as wdc
 
-def read_wdc(file_path: str, mode: str, rr: str) -> pd.DataFrame:
+# write_etd_batchで書き出す列（地点、傾斜面番号、壁体番号と1～24時のETD）
+ETD_COLUMNS = ['station', 'orientation', 'wall'] + [str(hour) for hour in range(1, 25)]
+
+# pandas、matplotlibは使用する関数の中で読み込む
+if TYPE_CHECKING:
+    import pandas as pd
+
+def read_wdc(file_path: str, mode: str, rr: str) -> 'pd.DataFrame':
     """weadac気象データを読み込む
 
+    ファイルの読み込みはwdc_reader.load_wdcで1回だけ行い、キャッシュした結果から取り出す
+
     Args:
         file_path (str): 読み込むファイルのパス
         mode (str): 暖房の場合は'heating'、冷房の場合は'cooling'
         rr (str): 超過危険率　'1.0%', '2.5%', '10.0%'
 
     Returns:
-        pd.DataFrame: _description_
+        pd.DataFrame: 時刻別の気象データ（列は'time', 'altitude', 'azimuth', 'wind d.', 'wind v.',
+            'diret.', 'diff.', 'temp.', 'humid.', 'long.'）
     """
 
-    if mode == 'heating':
-        skiprows = 170
-    elif mode == 'cooling':
-        skiprows = 192
-
-    # Read the fixed-width file into a DataFrame
-    df = pd.read_fwf(
-        file_path,
-        widths=[11] + [6] * 24, skiprows=skiprows,
-        nrows=20,
-        header=None,
-        encoding='shift-jis'
-        ).T
-    df = df.drop(0)
-
-    # Set the column names
-    df.columns = ['time', 'altitude', 'azimuth', 'wind d.', 'wind v.', 'diret. 1.0%', 'diff. 1.0%', 'temp. 1.0%', 'humid. 1.0%', 'long. 1.0%', 'diret. 2.5%', 'diff. 2.5%', 'temp. 2.5%', 'humid. 2.5%', 'long. 2.5%', 'diret. 10.0%', 'diff. 10.0%', 'temp. 10.0%', 'humid. 10.0%', 'long. 10.0%']
-    df = df[['time', 'altitude', 'azimuth', 'wind d.', 'wind v.'] + [col for col in df.columns if rr in col]]
-    for column in df.columns:
-        df[column] = pd.to_numeric(df[column], errors='coerce')
-
-    # ヘッダから超過危険率を削除
-    df.columns = df.columns.str.replace(' ' + rr, '')
- 
-    return df
-
-def calc_sh_sw_ss(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    import pandas as pd
+
+    section = wdc.get_wdc_section(wdc.load_wdc(file_path), mode, rr)
+
+    return pd.DataFrame(section, index=range(1, wdc.WDC_N_HOURS + 1))
+
+def calc_sh_sw_ss(df: 'pd.DataFrame') -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """sh=sin(h)、sw=cos(h)*sin(a)、ss=cos(h)*cos(a)を計算する
 
     Args:
-        df (pd.DataFrame): weadac気象データ
+        df (pd.DataFrame): weadac気象データ（wdc_reader.get_wdc_sectionの戻り値でもよい）
 
     Returns:
         tuple[np.ndarray, np.ndarray, np.ndarray]: _description_
     """
 
-    h = np.radians(df['altitude'].values)
-    a = np.radians(df['azimuth'].values)
+    h = np.radians(np.asarray(df['altitude'], dtype=float))
+    a = np.radians(np.asarray(df['azimuth'], dtype=float))
     # 太陽位置を表すsh, sw, ssの計算
     sh = np.sin(h)
     sw = np.cos(h) * np.sin(a)
@@ -78,7 +68,91 @@ def calc_wz_ww_ws(wa: float, wb: float) -> tuple[float, float, float]:
 
     return wz, ww, ws
 
+def calc_etd_batch(file_paths: List[str], mode: str, rr: str, wa: np.ndarray, wb: np.ndarray,
+                   rs_list: List[np.ndarray], cs_list: List[np.ndarray], albedo: float = 0.2, a_s: float = 0.7,
+                   R_so: float = 0.04, t_r: float = 26.0, i_max: int = 15) -> np.ndarray:
+    """複数の地点、傾斜面、壁体についてETDを一括で計算する
+
+    太陽位置は地点ごとに1回だけ計算し、傾斜面日射量、相当外気温度、周期定常の熱流は配列演算で計算する
+
+    Args:
+        file_paths (List[str]): 地点ごとのweadac気象データのパス
+        mode (str): 暖房の場合は'heating'、冷房の場合は'cooling'
+        rr (str): 超過危険率　'1.0%', '2.5%', '10.0%'
+        wa (np.ndarray): 傾斜面の方位角[rad]（南を0とし、東を正とする） (n_orientations,)
+        wb (np.ndarray): 傾斜面の傾斜角[rad]（水平を0とし、垂直を正とする） (n_orientations,)
+        rs_list (List[np.ndarray]): 壁体ごとの熱抵抗（室内側から）[m2･K/W]
+        cs_list (List[np.ndarray]): 壁体ごとの熱容量（室内側から）[J/(m2･K)]
+        albedo (float): 地物反射率
+        a_s (float): 壁体の日射吸収率
+        R_so (float): 屋外側表面熱伝達抵抗[m2･K/W]
+        t_r (float): 設計室温[℃]
+        i_max (int): 根を探索する上限数
+
+    Returns:
+        np.ndarray: ETD[℃] (n_stations, n_orientations, n_walls, 24)
+    """
+
+    wa = np.atleast_1d(np.asarray(wa, dtype=float))
+    wb = np.atleast_1d(np.asarray(wb, dtype=float))
+
+    # 地点ごとの太陽位置と気象データ (n_stations, 24)
+    sections = [wdc.get_wdc_section(wdc.load_wdc(file_path), mode, rr) for file_path in file_paths]
+    sh, sw, ss = (np.array(v) for v in zip(*[calc_sh_sw_ss(section) for section in sections]))
+    I_dn = np.array([section['diret.'] for section in sections])
+    I_sky = np.array([section['diff.'] for section in sections])
+    t_o = np.array([section['temp.'] for section in sections])
+
+    # 傾斜面 (n_orientations, 1)
+    wz, ww, ws = (v[:, np.newaxis] for v in calc_wz_ww_ws(wa, wb))
+    Fs = ((1.0 - np.cos(wb)) / 2.0)[:, np.newaxis]
+    Fg = 1.0 - Fs
+
+    # 傾斜面日射量、相当外気温度 (n_stations, n_orientations, 24)
+    sh, sw, ss = sh[:, np.newaxis, :], sw[:, np.newaxis, :], ss[:, np.newaxis, :]
+    I_dn, I_sky, t_o = I_dn[:, np.newaxis, :], I_sky[:, np.newaxis, :], t_o[:, np.newaxis, :]
+    cos_theta = np.maximum(wz * sh + ww * sw + ws * ss, 0.0)
+    I_hor = I_dn * sh + I_sky
+    slope_I = I_dn * cos_theta + I_sky * Fs + I_hor * albedo * Fg
+    t_e = t_o + slope_I * a_s * R_so
+
+    # 壁体の根 (n_walls, i_max)
+    rs, cs = rf.stack_walls(rs_list, cs_list)
+    a0, _, at, alpha = rf.calc_alpha_matsuo_method_batch(rs=rs, cs=cs, i_max=i_max)
+
+    # 周期定常状態の室内表面熱流 (n_stations, n_orientations, n_walls, 24)
+    q = rf.calc_periodic_response(theta=(t_e - t_r)[:, :, np.newaxis, :], a=at, alpha=alpha, a0=a0, delta_t=3600)
+
+    return q / a0[:, np.newaxis]
+
+def write_etd_batch(writer, etd: np.ndarray, station_names: List[str] = None) -> None:
+    """calc_etd_batchの結果を地点ごとに書き出す（表全体をメモリ上に作らない）
+
+    1行は1つの地点、傾斜面、壁体の24時間分のETDで、列はETD_COLUMNSの順とする
+
+    Args:
+        writer: 行のまとまりを受け取るwrite(chunk)を持つもの（sky_radiation/result_writer.ResultWriterなど）
+        etd (np.ndarray): calc_etd_batchの戻り値 (n_stations, n_orientations, n_walls, 24)
+        station_names (List[str]): 地点名（Noneの場合は地点番号を書き出す）
+    """
+
+    n_stations, n_orientations, n_walls, n_hours = etd.shape
+    orientation, wall = np.meshgrid(np.arange(n_orientations), np.arange(n_walls), indexing='ij')
+    index = np.column_stack([orientation.ravel(), wall.ravel()])
+
+    for i in range(n_stations):
+        chunk = {
+            'station': np.full(n_orientations * n_walls, i if station_names is None else station_names[i]),
+            'orientation': index[:, 0],
+            'wall': index[:, 1]
+        }
+        chunk.update({ETD_COLUMNS[3 + j]: etd[i, :, :, j].ravel() for j in range(n_hours)})
+        writer.write(chunk)
+
 if __name__ == '__main__':
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     file_path = 'weather_data/12467_KAGOSHIMA.wdc'
     mode = 'cooling'
     rr = '1.0%'
@@ -136,22 +210,14 @@ if __name__ == '__main__':
         0.0
     ])
     a0, _, at, alpha = rf.calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=15)
-    cyclic_phi_t = rf.calc_cyclic_response_factor(at=at, alpha=alpha, a0=a0, delta_t=3600)
     _, rft_t, r, _, rft1_t = rf.calc_triangle_response_factor(aa=_, at=at, alpha=alpha, a0=a0, n_max=50, delta_t=3600)
-    # 室内表面熱流の計算
-    q = np.zeros(24)
-    etd = np.zeros(24)
-    for n in range(24):
-        for j in range(24):
-            q[n] += cyclic_phi_t[j] * (t_e[n-j] - t_r)
+    # 室内表面熱流の計算（周期定常状態の熱流を直接求める）
+    q = rf.calc_periodic_response(theta=t_e - t_r, a=at, alpha=alpha, a0=a0, delta_t=3600)
 
     # 項別公比法による室内表面熱流の検証
-    q_kk = np.zeros(24)
-    q_dsh = np.zeros_like(alpha)
-    for n in range(365):
-        for t in range(24):
-            q_kk[t] = (t_e[t] - t_r) * rft_t[0] + np.sum(q_dsh)
-            q_dsh = (t_e[t] - t_r) * rft1_t + q_dsh * r
+    # 365日分繰り返して周期定常に近づけた最終日の熱流を使う
+    simulator = rf.WallResponseSimulator(rft0=rft_t[0], rft1=rft1_t, r=r)
+    q_kk = simulator.run(np.tile(t_e - t_r, 365))[0, -24:]
     
     # ETDの計算
     etd = q / a0
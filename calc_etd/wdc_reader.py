@@ -0,0 +1,259 @@
+import os
+import tempfile
+import zipfile
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# WEADAC気象データ（.wdc）の冷暖房設計用気象データの書式
+# 各行は項目名11文字と1時～24時の値（6文字ずつ）の固定幅
+WDC_LABEL_WIDTH = 11
+WDC_FIELD_WIDTH = 6
+WDC_N_HOURS = 24
+
+# 冷暖房それぞれの節の行（1行目は時刻、超過危険率ごとの行は危険率の小さい順）
+WDC_COMMON_ROWS = ['time', 'altitude', 'azimuth', 'wind d.', 'wind v.']
+WDC_RISK_RATES = ['1.0%', '2.5%', '10.0%']
+WDC_RISK_ROWS = ['diret.', 'diff.', 'temp.', 'humid.', 'long.']
+WDC_SECTION_ROWS = len(WDC_COMMON_ROWS) + len(WDC_RISK_RATES) * len(WDC_RISK_ROWS)
+
+# 節の見出しに含まれる語
+WDC_SECTION_KEYWORDS = {
+    'heating': '暖房',
+    'cooling': '冷房'
+}
+
+# 従来のread_wdc（pd.read_fwf）で読み飛ばしていた行数（節の先頭の行の位置）
+WDC_FIXED_SKIPROWS = {
+    'heating': 170,
+    'cooling': 192
+}
+
+# 書式の解釈を変更したときにキャッシュを無効にするためのバージョン
+_WDC_CACHE_VERSION = 3
+
+
+def _split_wdc_line(line: str) -> Tuple[str, List[str]]:
+    """1行を項目名と24時間分の値の文字列に分ける"""
+
+    label = line[:WDC_LABEL_WIDTH]
+    fields = [line[WDC_LABEL_WIDTH + WDC_FIELD_WIDTH * i: WDC_LABEL_WIDTH + WDC_FIELD_WIDTH * (i + 1)]
+              for i in range(WDC_N_HOURS)]
+
+    return label, fields
+
+
+def _to_float(field: str) -> float:
+    """数値に変換する（変換できない場合はnan）"""
+
+    try:
+        return float(field)
+    except ValueError:
+        return np.nan
+
+
+def _find_section_mode(header_lines: List[str]) -> Optional[str]:
+    """節の前の見出し行から冷暖房を判定する（判定できない場合はNone）
+
+    節に近い行から順に、WDC_SECTION_KEYWORDSの語を1つだけ含む行を探す
+    （'冷暖房'のように両方の語を含む行は判定に使わない）
+    """
+
+    for line in reversed(header_lines):
+        modes = [mode for mode, keyword in WDC_SECTION_KEYWORDS.items() if keyword in line]
+        if len(modes) == 1:
+            return modes[0]
+
+    return None
+
+
+def parse_wdc(file_path: str) -> Dict[str, np.ndarray]:
+    """weadac気象データを読み込み、冷暖房の節を配列にする（キャッシュは使わない）
+
+    値が半分以上数値の行をデータ行とし、続くデータ行の前の見出し行にあるWDC_SECTION_KEYWORDSの語で
+    冷暖房の節を探す（節の行の位置や順番は決めつけない）
+    冷暖房それぞれの見出しがちょうど1つあり、その後のデータ行がWDC_SECTION_ROWS行でない場合はエラーとする
+
+    Args:
+        file_path (str): 読み込むファイルのパス
+
+    Returns:
+        Dict[str, np.ndarray]: 'heating'、'cooling'ごとの値 (WDC_SECTION_ROWS, 24)（数値でない値はnan）
+
+    Raises:
+        ValueError: 冷暖房の見出しが無いか複数ある場合、または節の行数がWDC_SECTION_ROWSでない場合
+    """
+
+    with open(file_path, 'rb') as f:
+        lines = f.read().decode('shift-jis', errors='replace').splitlines()
+
+    values = np.full((len(lines), WDC_N_HOURS), np.nan)
+    for i, line in enumerate(lines):
+        _, fields = _split_wdc_line(line)
+        values[i] = [_to_float(field) for field in fields]
+    is_data = np.sum(~np.isnan(values), axis=1) * 2 >= WDC_N_HOURS
+
+    # 続くデータ行ごとに、その前の見出し行から冷暖房を判定する
+    found = {mode: [] for mode in WDC_SECTION_KEYWORDS}
+    header_start = 0
+    i = 0
+    while i < len(lines):
+        if not is_data[i]:
+            i += 1
+            continue
+        start = i
+        while i < len(lines) and is_data[i]:
+            i += 1
+        mode = _find_section_mode(lines[header_start:start])
+        if mode is not None:
+            found[mode].append((start, i - start))
+        header_start = i
+
+    sections = {}
+    for mode, blocks in found.items():
+        keyword = WDC_SECTION_KEYWORDS[mode]
+        if len(blocks) != 1:
+            raise ValueError("expected one section headed '{0}' ({1}) in {2}, found {3} (starting at lines {4})".format(
+                keyword, mode, file_path, len(blocks), [start for start, _ in blocks]))
+        start, n_rows = blocks[0]
+        if n_rows != WDC_SECTION_ROWS:
+            raise ValueError("section headed '{0}' ({1}) at line {2} in {3} has {4} rows, expected {5}".format(
+                keyword, mode, start, file_path, n_rows, WDC_SECTION_ROWS))
+        sections[mode] = start
+
+    return {mode: values[start:start + WDC_SECTION_ROWS] for mode, start in sections.items()}
+
+
+def compare_wdc_with_fixed_rows(file_path: str) -> Dict[str, bool]:
+    """parse_wdcの結果を、従来のread_wdcと同じpd.read_fwf（WDC_FIXED_SKIPROWS行を読み飛ばし、
+    WDC_SECTION_ROWS行を読む）の結果と比べる（実際の地点のファイルで節の判定を確かめるためのもの）
+
+    Args:
+        file_path (str): 読み込むファイルのパス
+
+    Returns:
+        Dict[str, bool]: 'heating'、'cooling'ごとに、値（nanの位置を含む）が一致する場合はTrue
+    """
+
+    # 確認のためだけに使うので、ここで読み込む
+    import pandas as pd
+
+    data = parse_wdc(file_path)
+
+    result = {}
+    for mode, skiprows in WDC_FIXED_SKIPROWS.items():
+        df = pd.read_fwf(
+            file_path,
+            widths=[WDC_LABEL_WIDTH] + [WDC_FIELD_WIDTH] * WDC_N_HOURS, skiprows=skiprows,
+            nrows=WDC_SECTION_ROWS,
+            header=None,
+            encoding='shift-jis'
+            )
+        expected = df.iloc[:, 1:].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        result[mode] = expected.shape == data[mode].shape and np.allclose(expected, data[mode], equal_nan=True)
+
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _load_wdc(file_path: str, size: int, mtime_ns: int, use_cache: bool) -> Dict[str, np.ndarray]:
+    """元ファイルの大きさ、更新時刻ごとに読み込んだ結果をプロセス内で保持する"""
+
+    cache_path = file_path + '.npz'
+
+    if use_cache:
+        try:
+            with np.load(cache_path) as f:
+                if int(f['version']) == _WDC_CACHE_VERSION and int(f['size']) == size \
+                        and int(f['mtime_ns']) == mtime_ns:
+                    data = {mode: f[mode] for mode in WDC_SECTION_KEYWORDS}
+                else:
+                    data = None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            data = None
+    else:
+        data = None
+
+    if data is None:
+        data = parse_wdc(file_path)
+        if use_cache:
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(suffix='.npz', dir=os.path.dirname(cache_path))
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, version=_WDC_CACHE_VERSION, size=size, mtime_ns=mtime_ns, **data)
+                os.replace(temp_path, cache_path)
+            except OSError:
+                # 元ファイルのフォルダに書き込めない場合は保存せずに読み込んだ値を使う
+                if temp_path is not None and os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    for v in data.values():
+        v.flags.writeable = False
+
+    return data
+
+
+def load_wdc(file_path: str, use_cache: bool = True) -> Dict[str, np.ndarray]:
+    """キャッシュを使ってweadac気象データを読み込む
+
+    プロセス内のキャッシュ、元ファイルの隣の.npzファイル（file_path + '.npz'）の順に探し、
+    無い場合や元ファイルが更新されている場合は読み込んで保存する（保存できない場合は保存しない）
+
+    Args:
+        file_path (str): 読み込むファイルのパス
+        use_cache (bool): .npzファイルを使う場合はTrue
+
+    Returns:
+        Dict[str, np.ndarray]: 'heating'、'cooling'ごとの値 (WDC_SECTION_ROWS, 24)（書き換え不可）
+    """
+
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+
+    return _load_wdc(file_path, stat.st_size, stat.st_mtime_ns, use_cache)
+
+
+def get_wdc_section(data: Dict[str, np.ndarray], mode: str, rr: str) -> Dict[str, np.ndarray]:
+    """冷暖房、超過危険率を指定して時刻別の値を取り出す
+
+    Args:
+        data (Dict[str, np.ndarray]): load_wdcの戻り値
+        mode (str): 暖房の場合は'heating'、冷房の場合は'cooling'
+        rr (str): 超過危険率　'1.0%', '2.5%', '10.0%'
+
+    Returns:
+        Dict[str, np.ndarray]: 項目ごとの24時間分の値（項目はWDC_COMMON_ROWSとWDC_RISK_ROWS）
+    """
+
+    if mode not in data:
+        raise ValueError("mode must be 'heating' or 'cooling'")
+    if rr not in WDC_RISK_RATES:
+        raise ValueError('rr must be one of {0}'.format(WDC_RISK_RATES))
+
+    values = data[mode]
+    section = {row: values[i] for i, row in enumerate(WDC_COMMON_ROWS)}
+    start = len(WDC_COMMON_ROWS) + WDC_RISK_RATES.index(rr) * len(WDC_RISK_ROWS)
+    section.update({row: values[start + i] for i, row in enumerate(WDC_RISK_ROWS)})
+
+    return section
+
+
+if __name__ == '__main__':
+
+    import time
+
+    file_path = 'weather_data/12467_KAGOSHIMA.wdc'
+
+    start = time.perf_counter()
+    data = load_wdc(file_path)
+    print('load_wdc: {0:.4f} s'.format(time.perf_counter() - start))
+
+    for mode in WDC_SECTION_KEYWORDS:
+        for rr in WDC_RISK_RATES:
+            section = get_wdc_section(data, mode, rr)
+            print(mode, rr, 'temp. max = {0}'.format(np.nanmax(section['temp.'])))
+
+    # 従来の行位置での読み込みとの比較
+    print(compare_wdc_with_fixed_rows(file_path))
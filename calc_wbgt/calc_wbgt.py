@@ -1,5 +1,5 @@
-import math
 import numpy as np
+from typing import Optional, Tuple, Union
 from scipy.optimize import fsolve
 
 def calc_wbgt(
@@ -63,33 +63,260 @@ def f_natural_wet_bulb_temperature(
         - 77.1 * velocity**0.421 * (calc_pas(natural_wet_bulb_temperature) - relative_humidity / 100.0 \
                                     * calc_pas(dry_bulb_temperature=dry_bulb_temperature))
 
-def calc_pas(dry_bulb_temperature: float) -> float:
+def calc_wbgt_array(
+        dry_bulb_temperature: np.ndarray,
+        relative_humidity: np.ndarray,
+        velocity: np.ndarray,
+        globe_temperature: np.ndarray,
+        is_sunstrike: np.ndarray,
+        tol: float = 1.0e-9,
+        max_iter: int = 100,
+        pas_table: Optional['PasTable'] = None
+        ) -> Tuple[np.ndarray, np.ndarray]:
+    """WBGTを配列で一括計算する（calc_wbgtの配列版）
+
+    Args:
+        dry_bulb_temperature (np.ndarray): 乾球温度[℃]
+        relative_humidity (np.ndarray): 相対湿度[%]
+        velocity (np.ndarray): 風速[m/s]
+        globe_temperature (np.ndarray): グローブ温度[℃]
+        is_sunstrike (np.ndarray): 日射が当たる場合はTrue
+        tol (float): 湿球温度の収束判定値[℃]
+        max_iter (int): 反復回数の上限
+        pas_table (Optional[PasTable]): 飽和水蒸気圧の表（Noneの場合は式で計算する）
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 湿球温度[℃]、WBGT[℃]（引数をブロードキャストした形状）
+    """
+    natural_wet_bulb_temperature = calc_natural_wet_bulb_temperature_array(
+        dry_bulb_temperature=dry_bulb_temperature,
+        relative_humidity=relative_humidity,
+        velocity=velocity,
+        globe_temperature=globe_temperature,
+        tol=tol,
+        max_iter=max_iter,
+        pas_table=pas_table
+    )
+
+    wbgt = np.where(
+        is_sunstrike,
+        0.7 * natural_wet_bulb_temperature + 0.3 * globe_temperature,       # 日射が当たる場合
+        0.7 * natural_wet_bulb_temperature + 0.2 * globe_temperature + 0.1 * dry_bulb_temperature    # 日射が当たらない場合
+    )
+    return natural_wet_bulb_temperature, wbgt
+
+def calc_natural_wet_bulb_temperature_array(
+        dry_bulb_temperature: np.ndarray,
+        relative_humidity: np.ndarray,
+        velocity: np.ndarray,
+        globe_temperature: np.ndarray,
+        tol: float = 1.0e-9,
+        max_iter: int = 100,
+        pas_table: Optional['PasTable'] = None
+        ) -> np.ndarray:
+    """湿球温度を配列で一括計算する（f_natural_wet_bulb_temperatureの根を求める）
+
+    湿球温度によらない項（平均放射温度、対流・蒸発の係数、乾球温度の飽和水蒸気圧）は反復の前に1回だけ計算する
+    残差は湿球温度について単調減少のため、根を挟む区間を保ちながらニュートン法で解き、
+    ニュートン法の更新が区間を外れる場合は二分法で更新する
+
+    Args:
+        dry_bulb_temperature (np.ndarray): 乾球温度[℃]
+        relative_humidity (np.ndarray): 相対湿度[%]
+        velocity (np.ndarray): 風速[m/s]
+        globe_temperature (np.ndarray): グローブ温度[℃]
+        tol (float): 湿球温度の収束判定値[℃]
+        max_iter (int): 反復回数の上限
+        pas_table (Optional[PasTable]): 飽和水蒸気圧の表（Noneの場合は式で計算する）
+
+    Returns:
+        np.ndarray: 湿球温度[℃]（引数をブロードキャストした形状）
+    """
+    t_a, rh, v, t_g = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (dry_bulb_temperature, relative_humidity, velocity, globe_temperature)))
+
+    #　湿球温度によらない項
+    t_r = calc_average_radiant_temperature(
+        globe_temperature=t_g,
+        dry_bulb_temperature=t_a,
+        velocity=v,
+        globe_emissivity=0.95,
+        globe_diameter=0.15
+    )
+    h_c = (4.18 * v**0.444).ravel()
+    h_e = (77.1 * v**0.421).ravel()
+    radiation_r = (1.0e-8 * (t_r + 273)**4).ravel()
+    # 乾球温度、相対湿度における水蒸気圧[kPa]
+    p_a = (rh / 100.0 * _calc_pas_and_derivative(t_a)[0]).ravel()
+    shape = t_a.shape
+    t_a = t_a.ravel()
+
+    calc_pas_and_derivative = _calc_pas_and_derivative if pas_table is None else pas_table.calc
+
+    def residual(t_nw: np.ndarray, i: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pas, dpas = calc_pas_and_derivative(t_nw)
+        f = h_c[i] * (t_a[i] - t_nw) + radiation_r[i] - 1.0e-8 * (t_nw + 273)**4 - h_e[i] * (pas - p_a[i])
+        df = - h_c[i] - 4.0e-8 * (t_nw + 273)**3 - h_e[i] * dpas
+        return f, df
+
+    # 根を挟む区間（上限では残差が0以下、下限では0以上）
+    upper = np.maximum(t_a, t_r.ravel())
+    lower = np.minimum(t_a, t_r.ravel()) - 100.0
+    t_nw = t_a.copy()
+
+    # 収束していない要素だけを計算する
+    active = np.arange(t_nw.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        x = t_nw[active]
+        f, df = residual(x, active)
+        lower[active] = np.where(f > 0, x, lower[active])
+        upper[active] = np.where(f > 0, upper[active], x)
+        x_new = x - f / df
+        out = (x_new < lower[active]) | (x_new > upper[active]) | ~np.isfinite(x_new)
+        x_new = np.where(out, (lower[active] + upper[active]) / 2, x_new)
+        t_nw[active] = x_new
+        active = active[(np.abs(x_new - x) > tol) & (f != 0)]
+
+    return t_nw.reshape(shape)
+
+def _calc_pas_and_derivative(dry_bulb_temperature: np.ndarray, derivative: bool = True) \
+        -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """飽和水蒸気圧とその温度微分を配列で計算する（Wexler-Hyland）
+
+    Args:
+        dry_bulb_temperature (np.ndarray): 乾球温度[℃]
+        derivative (bool): 温度微分も計算する場合はTrue
+
+    Returns:
+        Tuple[np.ndarray, Optional[np.ndarray]]: 飽和水蒸気圧[kPa]、その温度微分[kPa/K]（derivativeがFalseの場合はNone）
+    """
+    t = np.asarray(dry_bulb_temperature, dtype=float)
+    is_water = t >= 0.01
+    g = np.empty_like(t)
+    dg = np.empty_like(t)
+
+    # 水面、氷面の式はマスクで選び、それぞれ該当する要素だけで計算する
+    for mask, branch in ((is_water, _pas_water), (~is_water, _pas_ice)):
+        if mask.all():
+            g, dg = branch(t + 273, derivative)
+            break
+        if mask.any():
+            g[mask], dg_mask = branch(t[mask] + 273, derivative)
+            if derivative:
+                dg[mask] = dg_mask
+
+    pas = np.exp(g) / 1000
+    return pas, (pas * dg if derivative else None)
+
+def _pas_water(temp: np.ndarray, derivative: bool) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """水面の飽和水蒸気圧[Pa]の対数とその温度微分"""
+    g = - 0.58002206e4 / temp + 0.13914993e1 - 0.48640239e-1 * temp + 0.41764768e-4 * temp**2 \
+        - 0.14452093e-7 * temp**3 + 0.65459673e1 * np.log(temp)
+    if not derivative:
+        return g, None
+    dg = 0.58002206e4 / temp**2 - 0.48640239e-1 + 2 * 0.41764768e-4 * temp \
+        - 3 * 0.14452093e-7 * temp**2 + 0.65459673e1 / temp
+    return g, dg
+
+def _pas_ice(temp: np.ndarray, derivative: bool) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """氷面の飽和水蒸気圧[Pa]の対数とその温度微分"""
+    g = - 0.56745359e4 / temp + 0.63925247e1 - 0.96778430e-2 * temp + 0.62215701e-6 * temp**2 \
+        + 0.20747825e-8 * temp**3 - 0.94840240e-12 * temp**4 + 0.41635019e1 * np.log(temp)
+    if not derivative:
+        return g, None
+    dg = 0.56745359e4 / temp**2 - 0.96778430e-2 + 2 * 0.62215701e-6 * temp \
+        + 3 * 0.20747825e-8 * temp**2 - 4 * 0.94840240e-12 * temp**3 + 0.41635019e1 / temp
+    return g, dg
+
+def calc_pas(dry_bulb_temperature: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
     """飽和水蒸気圧を計算する（Wexler-Hyland）
 
+    配列を与えた場合は要素ごとに計算する（0.01℃以上は水面、未満は氷面の式）
+
     Args:
-        dry_bulb_temperature (float): 乾球温度[℃]
+        dry_bulb_temperature (Union[float, np.ndarray]): 乾球温度[℃]
 
     Returns:
-        float: 飽和水蒸気圧[kPa]
+        Union[float, np.ndarray]: 飽和水蒸気圧[kPa]（スカラーを与えた場合はfloat）
     """
-    
-    temp = dry_bulb_temperature + 273
-    if dry_bulb_temperature >= 0.01:
-        pas = math.exp(- 0.58002206e4 / temp
-            + 0.13914993e1
-            - 0.48640239e-1 * temp
-            + 0.41764768e-4 * temp**2
-            - 0.14452093e-7 * temp**3
-            + 0.65459673e1 * math.log(temp))
-    else:
-        pas = math.exp(- 0.56745359e4 / temp
-            + 0.63925247e1
-            - 0.96778430e-2 * temp
-            + 0.62215701e-6 * temp**2
-            + 0.20747825e-8 * temp**3
-            - 0.94840240e-12 * temp**4
-            + 0.41635019e1 * math.log(temp))
-    return pas / 1000
+    pas, _ = _calc_pas_and_derivative(dry_bulb_temperature, derivative=False)
+    return float(pas) if pas.ndim == 0 else pas
+
+class PasTable:
+    """飽和水蒸気圧の表
+
+    温度範囲を等間隔に分けた格子点で飽和水蒸気圧とその温度微分を計算しておき、
+    格子点の間は3次エルミート補間で求める（指数、対数の計算が不要になる）
+    範囲外の温度と、水面と氷面の式が切り替わる0.01℃をまたぐ区間はcalc_pasの式で計算する
+    """
+
+    def __init__(self, t_min: float = -50.0, t_max: float = 60.0, step: float = 0.1):
+        """
+        Args:
+            t_min (float): 表の下限温度[℃]
+            t_max (float): 表の上限温度[℃]
+            step (float): 格子点の間隔[℃]
+        """
+        self.t_min = t_min
+        self.step = step
+        self.n_intervals = int(round((t_max - t_min) / step))
+        self.t_max = t_min + step * self.n_intervals
+        t = t_min + step * np.arange(self.n_intervals + 1)
+        pas, dpas = _calc_pas_and_derivative(t)
+
+        # 区間ごとの3次エルミート補間の係数（区間内の位置 s (0～1) の多項式 c0 + c1 s + c2 s^2 + c3 s^3）
+        p0, p1 = pas[:-1], pas[1:]
+        m0, m1 = dpas[:-1] * step, dpas[1:] * step
+        self.c0 = p0
+        self.c1 = m0
+        self.c2 = 3 * (p1 - p0) - 2 * m0 - m1
+        self.c3 = 2 * (p0 - p1) + m0 + m1
+
+        # 0.01℃をまたぐ区間は補間しない
+        self.is_exact = (t[:-1] < 0.01) & (t[1:] >= 0.01)
+
+        # 各区間の内部の点で補間の最大相対誤差を確かめる
+        t_check = (t[:-1, np.newaxis] + step * np.linspace(0.05, 0.95, 19)).ravel()
+        pas_check, _ = _calc_pas_and_derivative(t_check, derivative=False)
+        self.max_relative_error = float(np.max(np.abs(self.calc(t_check, derivative=False)[0] / pas_check - 1.0)))
+
+    def calc(self, dry_bulb_temperature: np.ndarray, derivative: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """表から飽和水蒸気圧とその温度微分を求める
+
+        Args:
+            dry_bulb_temperature (np.ndarray): 乾球温度[℃]
+            derivative (bool): 温度微分も求める場合はTrue
+
+        Returns:
+            Tuple[np.ndarray, Optional[np.ndarray]]: 飽和水蒸気圧[kPa]、その温度微分[kPa/K]（derivativeがFalseの場合はNone）
+        """
+        t = np.asarray(dry_bulb_temperature, dtype=float)
+        x = (t - self.t_min) / self.step
+        # fmin、fmaxはnanを無視する（nanは後で式で計算する）
+        i = np.fmax(np.fmin(x, self.n_intervals - 1), 0).astype(int)
+        s = x - i
+
+        c1, c2, c3 = self.c1[i], self.c2[i], self.c3[i]
+        pas = ((c3 * s + c2) * s + c1) * s + self.c0[i]
+        dpas = ((3 * c3 * s + 2 * c2) * s + c1) / self.step if derivative else None
+
+        # 範囲外と0.01℃をまたぐ区間は式で計算する（nanは範囲外とする）
+        is_exact = ~((x >= 0) & (x <= self.n_intervals)) | self.is_exact[i]
+        if np.any(is_exact):
+            pas_exact, dpas_exact = _calc_pas_and_derivative(t[is_exact], derivative)
+            pas = np.array(pas)
+            pas[is_exact] = pas_exact
+            if derivative:
+                dpas = np.array(dpas)
+                dpas[is_exact] = dpas_exact
+
+        return pas, dpas
+
+    def __call__(self, dry_bulb_temperature: np.ndarray) -> np.ndarray:
+        """表から飽和水蒸気圧[kPa]を求める"""
+        return self.calc(dry_bulb_temperature, derivative=False)[0]
 
 def calc_average_radiant_temperature(
         globe_temperature: float,
@@ -126,3 +353,14 @@ if __name__ == "__main__":
         t_nw, wbgt[i] = calc_wbgt(t_db, rh, v, t_g, True)
         print(t_db, t_g, v, rh, t_nw, wbgt[i])
     
+
+    # 配列で一括計算する場合
+    t_nw, wbgt_array = calc_wbgt_array(dry_bulb_temperature, relative_humidity, velocity, globe_temperature, True)
+    print(np.max(np.abs(wbgt_array - wbgt)))
+
+    # 飽和水蒸気圧の表を使う場合
+    pas_table = PasTable(t_min=-50.0, t_max=60.0, step=0.1)
+    print('PasTable max relative error: {0:.3e}'.format(pas_table.max_relative_error))
+    t_nw, wbgt_table = calc_wbgt_array(dry_bulb_temperature, relative_humidity, velocity, globe_temperature, True,
+                                       pas_table=pas_table)
+    print(np.max(np.abs(wbgt_table - wbgt)))
@@ -1,6 +1,15 @@
+from collections import OrderedDict
 import numpy as np
+from typing import Dict, List, Tuple, Union
 from scipy import optimize
 
+# ステファンボルツマン定数
+SIGMA = 5.67e-8
+
+# f_barのメモ（面積比を昇順に並べたものをキーとし、最近使っていないものから消す）
+F_BAR_CACHE_SIZE = 4096
+_f_bar_cache: 'OrderedDict[Tuple[float, ...], float]' = OrderedDict()
+
 def calc_radiative_heat_transfer_coeff(area: np.ndarray, emissivity: np.ndarray, mrt: float) -> np.ndarray:
 
     """永田の方法による放射熱伝達率の計算
@@ -12,15 +21,11 @@ def calc_radiative_heat_transfer_coeff(area: np.ndarray, emissivity: np.ndarray,
         np.ndarray: 微小球に対する放射熱伝達率[W/(m2･K)]
     """
 
-
-    # ステファンボルツマン定数
-    SIGMA = 5.67e-8
-
     # 面積比の計算
     area_ratio= area / np.sum(area)
 
     # f_barの計算
-    f_bar = optimize.fsolve(lambda f_bar: calc_f(f_bar, area_ratio=area_ratio), 1.0e-6)
+    f_bar = solve_f_bar(area_ratio=area_ratio)
 
     # 微小球に対する形態係数
     f_mrt = 0.5 * (1.0 - np.sqrt(1.0 - 4.0 * area_ratio / f_bar))
@@ -34,6 +39,198 @@ def calc_f(f_bar: float, area_ratio: np.ndarray) -> float:
     return 0.5 * np.sum(1.0 - np.sign(1.0 - 4 * area_ratio / f_bar) * np.sqrt(np.abs(1.0 - 4 * area_ratio / f_bar))) - 1.0
 
 
+def calc_f_residual(f_bar: float, area_ratio: np.ndarray, axis: Union[int, None] = None) -> float:
+
+    """有効な範囲（f_bar ≧ 4･max(面積比)）でのcalc_f
+        平方根の中が負となる範囲を使わないため、np.sign、np.absによる延長をせず、丸め誤差による負の値は0とする
+        f_barについて単調減少する
+        f_bar: f_bar
+        area_ratio: 面積比[-]
+        axis: 和をとる軸（Noneの場合はすべての要素の和）
+
+    Returns:
+        float: 形態係数の和と1との差
+    """
+
+    return 0.5 * np.sum(1.0 - np.sqrt(np.maximum(1.0 - 4.0 * area_ratio / f_bar, 0.0)), axis=axis) - 1.0
+
+
+def calc_f_bar_bracket(area_ratio: np.ndarray, axis: Union[int, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+
+    """f_barの解を含む区間を計算する
+        下限は平方根の中が負とならない 4･max(面積比)
+        上限は 1 - sqrt(1 - x) ≦ x より calc_f_residual(2) ≦ 0 となる 2
+        area_ratio: 面積比[-]
+        axis: 部位の軸（Noneの場合はすべての要素）
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 下限、上限
+    """
+
+    lower = 4.0 * np.max(area_ratio, axis=axis)
+    return lower, np.full_like(lower, 2.0)
+
+
+def solve_f_bar(area_ratio: np.ndarray, xtol: float = 1.0e-12, full_output: bool = False) \
+        -> Union[float, Tuple[float, int]]:
+
+    """f_barをBrent法で求める
+        calc_f_residualは区間 [4･max(面積比), 2] で単調減少するため、下限で0以上であれば解はただ1つであり、
+        解との差がxtol（と浮動小数点の丸め誤差）以下となることが保証される
+        下限で負の場合は有効な解が無いため例外とする（fsolveのように無効な範囲の解を返さない）
+        area_ratio: 面積比[-]
+        xtol: f_barの収束判定の幅
+        full_output: 残差の計算回数も返す場合はTrue
+
+    Returns:
+        Union[float, Tuple[float, int]]: f_bar（full_outputがTrueの場合はf_barと残差の計算回数）
+    """
+
+    area_ratio = np.asarray(area_ratio, dtype=float)
+    lower, upper = calc_f_bar_bracket(area_ratio)
+    lower, upper = float(lower), float(upper)
+
+    def residual(f_bar: float) -> float:
+        return calc_f_residual(f_bar, area_ratio=area_ratio)
+
+    if residual(lower) < 0.0:
+        raise ValueError('no valid f_bar: the sum of view factors is less than 1 at f_bar = 4 * max(area_ratio)')
+
+    f_bar, result = optimize.brentq(residual, lower, upper, xtol=xtol, full_output=True)
+
+    if full_output:
+        # 下限の確認の1回を含める
+        return f_bar, result.function_calls + 1
+    return f_bar
+
+
+def calc_f_bar_signature(area: np.ndarray) -> Tuple[float, ...]:
+
+    """f_barのメモのキーを計算する
+        f_barは面積比の並び順によらないため、面積を昇順に並べてから面積比を計算する
+        （同じ寸法の室は部位の順序が異なっても同じキーになる）
+        area: 部位の面積[m2]
+
+    Returns:
+        Tuple[float, ...]: 昇順に並べた面積比（12桁に丸めたもの）
+    """
+
+    area = np.sort(np.asarray(area, dtype=float))
+    return tuple(np.round(area / np.sum(area), 12).tolist())
+
+
+def calc_f_bar_batch(areas: List[np.ndarray], use_cache: bool = True, xtol: float = 1.0e-12, max_iter: int = 100) \
+        -> np.ndarray:
+
+    """複数の室のf_barをまとめて計算する
+        面積比を0で埋めた (室数, 最大部位数) の配列とし、すべての室を同時に二分法で解く
+        （面積比0の部位はcalc_fに寄与しない）
+        初期の区間はcalc_f_bar_bracket（この範囲でcalc_f_residualは単調減少する）
+        areas: 室ごとの部位の面積[m2]のリスト（室ごとに部位数が異なってもよい）
+        use_cache: 同じ面積比の室のf_barをメモから取り出す場合はTrue（メモはF_BAR_CACHE_SIZE個まで）
+        xtol: f_barの収束判定の幅
+        max_iter: 反復回数の上限
+
+    Returns:
+        np.ndarray: 室ごとのf_bar (室数,)
+
+    Raises:
+        ValueError: 4･max(面積比)でcalc_f_residualが負となり、有効な解が無い室がある場合（solve_f_barと同じ）
+    """
+
+    signatures = [calc_f_bar_signature(area) for area in areas]
+
+    # メモにある面積比は取り出し、無い面積比だけを解く（同じ面積比は1回だけ）
+    f_bar_solved: Dict[Tuple[float, ...], float] = {}
+    if use_cache:
+        for signature in dict.fromkeys(signatures):
+            if signature in _f_bar_cache:
+                _f_bar_cache.move_to_end(signature)
+                f_bar_solved[signature] = _f_bar_cache[signature]
+    unsolved = [signature for signature in dict.fromkeys(signatures) if signature not in f_bar_solved]
+
+    if len(unsolved) > 0:
+        n_max = max(len(signature) for signature in unsolved)
+        area_ratio = np.zeros((len(unsolved), n_max))
+        for i, signature in enumerate(unsolved):
+            area_ratio[i, :len(signature)] = signature
+
+        def residual(f_bar: np.ndarray) -> np.ndarray:
+            return calc_f_residual(f_bar[:, np.newaxis], area_ratio=area_ratio, axis=1)
+
+        lower, upper = calc_f_bar_bracket(area_ratio, axis=1)
+        # 下限でcalc_fが負の場合は有効な解が無い
+        is_valid = residual(lower) >= 0.0
+        for _ in range(max_iter):
+            if np.all(upper - lower <= xtol):
+                break
+            middle = 0.5 * (lower + upper)
+            is_positive = residual(middle) >= 0.0
+            lower = np.where(is_positive, middle, lower)
+            upper = np.where(is_positive, upper, middle)
+
+        if not np.all(is_valid):
+            invalid = {signature for signature, valid in zip(unsolved, is_valid) if not valid}
+            rooms = [i for i, signature in enumerate(signatures) if signature in invalid]
+            raise ValueError('no valid f_bar for rooms {0}: the sum of view factors is less than 1 '
+                             'at f_bar = 4 * max(area_ratio)'.format(rooms))
+
+        f_bar = 0.5 * (lower + upper)
+        for signature, value in zip(unsolved, f_bar.tolist()):
+            f_bar_solved[signature] = value
+            if use_cache:
+                _f_bar_cache[signature] = value
+                if len(_f_bar_cache) > F_BAR_CACHE_SIZE:
+                    _f_bar_cache.popitem(last=False)
+
+    return np.array([f_bar_solved[signature] for signature in signatures])
+
+
+def calc_radiative_heat_transfer_coeff_batch(areas: List[np.ndarray], emissivities: List[np.ndarray],
+                                             mrts: Union[float, np.ndarray], use_cache: bool = True) \
+        -> List[np.ndarray]:
+
+    """複数の室の永田の方法による放射熱伝達率の計算
+        areas: 室ごとの部位の面積[m2]のリスト（室ごとに部位数が異なってもよい）
+        emissivities: 室ごとの放射率[-]のリスト
+        mrts: 室ごとの放射熱伝達率計算時のMRT[C]（スカラーの場合はすべての室で同じ）
+        use_cache: 同じ面積比の室のf_barをメモから取り出す場合はTrue
+
+    Returns:
+        List[np.ndarray]: 室ごとの微小球に対する放射熱伝達率[W/(m2･K)]
+
+    Raises:
+        ValueError: f_barの有効な解が無い室がある場合（calc_f_bar_batch参照）
+    """
+
+    n_surfaces = [len(area) for area in areas]
+    f_bar = calc_f_bar_batch(areas, use_cache=use_cache)
+
+    # 全室の部位を1列に並べて計算する
+    room = np.repeat(np.arange(len(areas)), n_surfaces)
+    area = np.concatenate([np.asarray(a, dtype=float) for a in areas])
+    emissivity = np.concatenate([np.asarray(e, dtype=float) for e in emissivities])
+    mrt = np.broadcast_to(np.asarray(mrts, dtype=float), (len(areas),))[room]
+
+    area_ratio = area / np.bincount(room, weights=area, minlength=len(areas))[room]
+
+    # 微小球に対する形態係数
+    f_mrt = 0.5 * (1.0 - np.sqrt(1.0 - 4.0 * area_ratio / f_bar[room]))
+
+    # 微小球に対する放射熱伝達率
+    h_r = emissivity / (1.0 - emissivity * f_mrt) * 4.0 * SIGMA * (mrt + 273.15) ** 3
+
+    return np.split(h_r, np.cumsum(n_surfaces)[:-1])
+
+
+def clear_f_bar_cache() -> None:
+
+    """f_barのメモを消去する"""
+
+    _f_bar_cache.clear()
+
+
+
 def calc_weights_for_mrt(h_r: np.ndarray, area: np.ndarray) -> np.ndarray:
 
     """放射伝熱計算時の微小球の放射温度計算における各面の重みを計算する
@@ -54,3 +251,15 @@ if __name__ == '__main__':
     h_r = calc_radiative_heat_transfer_coeff(area=area, emissivity=emissivity, mrt=20.0)
 
     print (h_r)
+
+    # 残差の計算回数（fsolveとBrent法）
+    area_ratio = area / np.sum(area)
+    _, info, _, _ = optimize.fsolve(lambda f_bar: calc_f(f_bar, area_ratio=area_ratio), 1.0e-6, full_output=True)
+    print ('fsolve: {0}, solve_f_bar: {1}'.format(info['nfev'], solve_f_bar(area_ratio, full_output=True)[1]))
+
+    # 複数の室をまとめて計算する場合（同じ寸法の室はf_barを1回だけ計算する）
+    areas = [area, np.array([30.0, 30.0, 18.0, 18.0, 15.0, 15.0]), area[::-1]] * 1000
+    emissivities = [np.full(len(a), 0.9) for a in areas]
+    h_r_batch = calc_radiative_heat_transfer_coeff_batch(areas=areas, emissivities=emissivities, mrts=20.0)
+
+    print (h_r_batch[0], len(_f_bar_cache))
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import Optional, Tuple, Union
+from scipy import linalg
+
+from radiative_heat_transfer_coeff import SIGMA, calc_radiative_heat_transfer_coeff, calc_weights_for_mrt
+
+# 直方体の室の部位の順序
+# 床、天井、間口方向の壁2面（間口×高さ）、奥行方向の壁2面（奥行×高さ）
+BOX_SURFACES = ['floor', 'ceiling', 'wall_width_1', 'wall_width_2', 'wall_depth_1', 'wall_depth_2']
+
+
+def calc_view_factor_parallel(a: float, b: float, c: float) -> float:
+
+    """向かい合う同じ大きさの平行な長方形の形態係数
+        a, b: 長方形の辺の長さ[m]
+        c: 長方形の間の距離[m]
+
+    Returns:
+        float: 形態係数[-]
+    """
+
+    x = a / c
+    y = b / c
+    x1 = np.sqrt(1.0 + x * x)
+    y1 = np.sqrt(1.0 + y * y)
+
+    return 2.0 / (np.pi * x * y) * (
+        np.log(x1 * y1 / np.sqrt(1.0 + x * x + y * y))
+        + x * y1 * np.arctan(x / y1) + y * x1 * np.arctan(y / x1)
+        - x * np.arctan(x) - y * np.arctan(y))
+
+
+def calc_view_factor_perpendicular(l: float, w: float, h: float) -> float:
+
+    """1辺を共有して直交する長方形の形態係数
+        l: 共有する辺の長さ[m]
+        w: 形態係数を求める元の長方形の、共有する辺と直交する辺の長さ[m]
+        h: 相手の長方形の、共有する辺と直交する辺の長さ[m]
+
+    Returns:
+        float: 形態係数[-]
+    """
+
+    w = w / l
+    h = h / l
+    w2 = w * w
+    h2 = h * h
+    wh = np.sqrt(w2 + h2)
+
+    return 1.0 / (np.pi * w) * (
+        w * np.arctan(1.0 / w) + h * np.arctan(1.0 / h) - wh * np.arctan(1.0 / wh)
+        + 0.25 * (np.log((1.0 + w2) * (1.0 + h2) / (1.0 + w2 + h2))
+                  + w2 * np.log(w2 * (1.0 + w2 + h2) / ((1.0 + w2) * (w2 + h2)))
+                  + h2 * np.log(h2 * (1.0 + w2 + h2) / ((1.0 + h2) * (w2 + h2)))))
+
+
+def calc_box_view_factors(width: float, depth: float, height: float) -> Tuple[np.ndarray, np.ndarray]:
+
+    """直方体の室の部位の面積と形態係数を計算する（部位の順序はBOX_SURFACES）
+        width: 間口[m]
+        depth: 奥行[m]
+        height: 高さ[m]
+
+    Returns:
+        area: 部位の面積[m2] (6,)
+        view_factor: 形態係数（行の部位から列の部位を見たもの）[-] (6, 6)
+    """
+
+    # 部位ごとの2辺の長さ（間口、奥行、高さのどの方向か）と、その法線方向
+    size = {'x': width, 'y': depth, 'z': height}
+    surfaces = [('x', 'y', 'z'), ('x', 'y', 'z'), ('x', 'z', 'y'), ('x', 'z', 'y'), ('y', 'z', 'x'), ('y', 'z', 'x')]
+
+    area = np.array([size[s1] * size[s2] for s1, s2, _ in surfaces])
+    view_factor = np.zeros((6, 6))
+
+    for i, (i1, i2, i_n) in enumerate(surfaces):
+        for j, (j1, j2, j_n) in enumerate(surfaces):
+            if i == j:
+                continue
+            if i_n == j_n:
+                # 向かい合う面
+                view_factor[i, j] = calc_view_factor_parallel(size[i1], size[i2], size[i_n])
+            else:
+                # 隣り合う面（共有する辺は両方の面に含まれる方向）
+                edge = ({i1, i2} & {j1, j2}).pop()
+                view_factor[i, j] = calc_view_factor_perpendicular(
+                    l=size[edge], w=size[({i1, i2} - {edge}).pop()], h=size[({j1, j2} - {edge}).pop()])
+
+    return area, view_factor
+
+
+class RadiosityExchangeSolver:
+
+    """灰色拡散面の放射度（ラジオシティ）による室内長波放射交換の計算
+        永田の方法（微小球による近似）の検証や、近似の精度が不十分な室で使う
+        係数行列 [I - diag(1 - ε) F] を室の形状と放射率ごとに1回だけLU分解しておき、
+        各時刻では前進代入と後退代入のみを行う（複数の時刻をまとめて与えた場合は1回の呼び出しで解く）
+    """
+
+    def __init__(self, area: np.ndarray, view_factor: np.ndarray, emissivity: Union[float, np.ndarray]):
+
+        """
+            area: 部位の面積[m2] (n_surfaces,)
+            view_factor: 形態係数（行の部位から列の部位を見たもの）[-] (n_surfaces, n_surfaces)
+            emissivity: 放射率[-] (n_surfaces,)、全部位で共通の場合はスカラー
+        """
+
+        self.area = np.asarray(area, dtype=float)
+        self.view_factor = np.asarray(view_factor, dtype=float)
+        self.n_surfaces = len(self.area)
+        self.emissivity = np.broadcast_to(np.asarray(emissivity, dtype=float), (self.n_surfaces,)).copy()
+
+        # 放射度の連立方程式 J - (1 - ε) F J = ε σ T^4 の係数行列
+        matrix = np.eye(self.n_surfaces) - (1.0 - self.emissivity)[:, np.newaxis] * self.view_factor
+        self._lu = linalg.lu_factor(matrix)
+
+    @classmethod
+    def from_box(cls, width: float, depth: float, height: float, emissivity: Union[float, np.ndarray] = 0.9) \
+            -> 'RadiosityExchangeSolver':
+
+        """直方体の室から作成する（部位の順序はBOX_SURFACES）
+            width: 間口[m]
+            depth: 奥行[m]
+            height: 高さ[m]
+            emissivity: 放射率[-] (6,)、全部位で共通の場合はスカラー
+        """
+
+        area, view_factor = calc_box_view_factors(width=width, depth=depth, height=height)
+
+        return cls(area=area, view_factor=view_factor, emissivity=emissivity)
+
+    def calc_radiosity(self, theta: np.ndarray) -> np.ndarray:
+
+        """表面温度から放射度を計算する
+            theta: 表面温度[℃] (n_surfaces, n_steps)、1時刻の場合は(n_surfaces,)
+
+        Returns:
+            np.ndarray: 放射度[W/m2]（thetaと同じ形）
+        """
+
+        theta = np.asarray(theta, dtype=float)
+        emissive_power = SIGMA * (theta + 273.15) ** 4
+
+        return linalg.lu_solve(self._lu, self.emissivity.reshape((-1,) + (1,) * (theta.ndim - 1)) * emissive_power)
+
+    def calc_net_radiation(self, theta: np.ndarray, radiosity: Optional[np.ndarray] = None) -> np.ndarray:
+
+        """表面温度から各部位の正味の放射熱流を計算する
+            theta: 表面温度[℃] (n_surfaces, n_steps)、1時刻の場合は(n_surfaces,)
+            radiosity: calc_radiosityで計算した放射度[W/m2]（Noneの場合はここで計算する）
+
+        Returns:
+            np.ndarray: 正味の放射熱流（表面から室内へ向かう方向を正とする）[W/m2]（thetaと同じ形）
+        """
+
+        if radiosity is None:
+            radiosity = self.calc_radiosity(theta)
+
+        # 放射度と入射量の差
+        return radiosity - self.view_factor @ radiosity
+
+
+if __name__ == '__main__':
+
+    import time
+
+    # 間口5m、奥行6m、高さ3mの室
+    width, depth, height = 5.0, 6.0, 3.0
+    solver = RadiosityExchangeSolver.from_box(width=width, depth=depth, height=height, emissivity=0.9)
+    print(solver.area)
+    print(np.sum(solver.view_factor, axis=1))
+
+    # 1年間の1時間ごとの表面温度（床暖房を想定して床を高くする）
+    n_steps = 8760
+    hour = np.arange(n_steps)
+    theta = 20.0 + 2.0 * np.sin(2.0 * np.pi * hour / 24.0)[np.newaxis, :] \
+        + np.array([8.0, 1.0, 0.0, -3.0, 0.0, 0.0])[:, np.newaxis]
+
+    start = time.perf_counter()
+    q = solver.calc_net_radiation(theta)
+    print('radiosity: {0:.4f} s'.format(time.perf_counter() - start))
+    # 室全体の正味の放射熱流は0
+    print(np.max(np.abs(solver.area @ q)))
+
+    # 永田の方法との比較
+    h_r = calc_radiative_heat_transfer_coeff(area=solver.area, emissivity=solver.emissivity, mrt=20.0)
+    weights = calc_weights_for_mrt(h_r=h_r, area=solver.area)
+    q_nagata = h_r[:, np.newaxis] * (theta - weights @ theta)
+    print(q[:, 0])
+    print(q_nagata[:, 0])
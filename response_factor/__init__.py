@@ -0,0 +1,55 @@
+"""壁体の応答係数（留数定理による根、単位応答、二等辺三角波励振の応答係数）の計算
+
+各関数は最初に参照されたときに該当するモジュールを読み込むため、
+必要な関数だけを使うプロセスの起動時間を短くできる
+
+    import response_factor as rf
+    a0, aa, at, alpha = rf.calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=15)
+"""
+
+import importlib
+from typing import Any, List
+
+# 公開する名前と定義しているモジュール
+_ATTRIBUTE_MODULES = {
+    # 根の計算
+    'calc_alpha_matsuo_method': 'matsuo',
+    'calc_alpha_matsuo_method_adaptive': 'matsuo',
+    'calc_alpha_matsuo_method_batch': 'matsuo',
+    'stack_walls': 'matsuo',
+    'calc_Bs': 'matsuo',
+    'calc_Bs_batch': 'matsuo',
+    # 応答係数の計算
+    'calc_cyclic_response_factor': 'factors',
+    'calc_periodic_response': 'factors',
+    'calc_step_respose_factor': 'factors',
+    'calc_step_response_factor_matrix': 'factors',
+    'calc_triangle_response_factor': 'factors',
+    'calc_triangle_response_factor_terms': 'factors',
+    'calc_triangle_response_factor_matrix': 'factors',
+    # 室内表面熱流の時系列計算
+    'WallResponseSimulator': 'simulator',
+    # 応答係数のキャッシュ
+    'calc_response_factor_key': 'cache',
+    'load_response_factor': 'cache',
+    'clear_response_factor_memory_cache': 'cache',
+}
+
+__all__ = list(_ATTRIBUTE_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+
+    module_name = _ATTRIBUTE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+
+    return sorted(list(globals()) + __all__)
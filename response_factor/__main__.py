@@ -0,0 +1,34 @@
+import numpy as np
+
+import response_factor as rf
+
+if __name__ == '__main__':
+
+    rs = np.array([
+        1.0 / 9.1,
+        0.15 / 1.6,
+        0.12 / 0.034,
+        1.0 / 11.1
+    ])
+
+    cs = np.array([
+        0.0,
+        2000.0 * 0.15 * 1000.0,
+        61.0 * 0.05 * 1000.0,
+        0.0 
+    ])
+
+    # 根の計算
+    a0, aa, at, alpha = rf.calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=15)
+
+    print(a0)
+    print(alpha)
+
+    # 単位応答の計算
+    phi_a, phi_t = rf.calc_step_respose_factor(aa=aa, at=at, alpha=alpha, a0=a0, n_max=50, delta_t=900)
+
+    # 二等辺三角波励振の応答係数の計算
+    rft_a, rft_t, _, _, _ = rf.calc_triangle_response_factor(aa=aa, at=at, alpha=alpha, a0=a0, n_max=50, delta_t=900)
+    print(rft_t)
+
+    laps, Bs = rf.calc_Bs(rs=rs, cs=cs, alpha=alpha)
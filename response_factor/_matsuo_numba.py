@@ -0,0 +1,102 @@
+import numpy as np
+import math
+from numba import njit
+
+# calc_alpha_matsuo_methodのNumbaによるコンパイル版
+# 計算手順は_calc_root_matsuo_methodと同じ
+
+
+@njit(cache=True)
+def calc_alpha_matsuo_method_kernel(rs: np.ndarray, cs: np.ndarray, i_max: int):
+
+    """ 留数定理で根を求める
+        rs: 熱抵抗（室内側から）[m2 K/W]（連続したfloat64の配列）
+        cs: 熱容量（室内側から）[J/(m2 K)]（連続したfloat64の配列）
+        i_max: 根を探索する上限数
+
+    Returns:
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+    """
+
+    n_layers = len(rs)
+
+    alpha = np.zeros(i_max)
+    aa = np.zeros(i_max)
+    at = np.zeros(i_max)
+
+    rcs = rs * cs
+
+    d = np.zeros((n_layers, 4))
+    dd = np.zeros((n_layers, 4))
+    cd = np.zeros((n_layers, 4))
+    cdd = np.zeros((n_layers, 4))
+
+    for i in range(i_max):
+        for k in range(n_layers):
+            d[k, 0] = 1.0
+            d[k, 1] = rs[k]
+            d[k, 2] = 0.0
+            d[k, 3] = 1.0
+            dd[k, 0] = 0.5 * rcs[k]
+            dd[k, 1] = rs[k] * rcs[k] / 6.0
+            dd[k, 2] = cs[k]
+            dd[k, 3] = dd[k, 0]
+
+        s = 0.0
+        s1 = 0.0
+        for j in range(9999):
+            for m in range(4):
+                cd[0, m] = d[0, m]
+                cdd[0, m] = d[0, m]
+            for k in range(1, n_layers):
+                cd[k, 0] = cd[k-1, 0] * d[k, 0] + cd[k-1, 1] * d[k, 2]
+                cd[k, 1] = cd[k-1, 0] * d[k, 1] + cd[k-1, 1] * d[k, 0]
+                cd[k, 2] = cd[k-1, 2] * d[k, 0] + cd[k-1, 3] * d[k, 2]
+                cd[k, 3] = cd[k-1, 2] * d[k, 1] + cd[k-1, 3] * d[k, 0]
+                cdd[k, 0] = cd[k-1, 0] * dd[k, 0] + cdd[k-1, 0] * d[k, 0] \
+                    + cd[k-1, 1] * dd[k, 2] + cdd[k-1, 1] * d[k, 2]
+                cdd[k, 1] = cd[k-1, 0] * dd[k, 1] + cdd[k-1, 0] * d[k, 1] \
+                    + cd[k-1, 1] * dd[k, 0] + cdd[k-1, 1] * d[k, 0]
+                cdd[k, 2] = cd[k-1, 2] * dd[k, 0] + cdd[k-1, 2] * d[k, 0] \
+                    + cd[k-1, 3] * dd[k, 2] + cdd[k-1, 3] * d[k, 2]
+                cdd[k, 3] = cd[k-1, 2] * dd[k, 1] + cdd[k-1, 2] * d[k, 1] \
+                    + cd[k-1, 3] * dd[k, 0] + cdd[k-1, 3] * d[k, 0]
+
+            y = cd[n_layers-1, 1]
+            yd = cdd[n_layers-1, 1]
+
+            # 既に求めた根による減次
+            if i != 0:
+                w1 = 0.0
+                for jj in range(i):
+                    w1 += 1.0 / (s + alpha[jj])
+                yd -= y * w1
+
+            s1 = s - y / yd
+            if s1 < s:
+                s = s1
+                for k in range(n_layers):
+                    if cs[k] > 0.0:
+                        w1 = math.sqrt(- s * rcs[k])
+                        w2 = math.cos(w1)
+                        w3 = math.sin(w1)
+
+                        d[k, 0] = w2
+                        d[k, 1] = rs[k] * w3 / w1
+                        d[k, 2] = - w1 * w3 / rs[k]
+                        d[k, 3] = w2
+
+                        dd[k, 0] = 0.5 * rcs[k] * w3 / w1
+                        dd[k, 1] = 0.5 * rs[k] * rcs[k] * (w3 / w1 - w2) / w1 ** 2
+                        dd[k, 2] = 0.5 * cs[k] * (w3 / w1 + w2)
+                        dd[k, 3] = dd[k, 0]
+            else:
+                break
+
+        alpha[i] = - s1
+        at[i] = 1.0 / (s1 * cdd[n_layers-1, 1])
+        aa[i] = cd[n_layers-1, 3] * at[i]
+
+    return aa, at, alpha
@@ -0,0 +1,152 @@
+import os
+import hashlib
+import tempfile
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .factors import calc_cyclic_response_factor, calc_triangle_response_factor
+from .matsuo import calc_alpha_matsuo_method
+
+# 応答係数キャッシュの保存先
+RESPONSE_FACTOR_CACHE_DIR = os.environ.get(
+    'RESPONSE_FACTOR_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'response_factor'))
+# プロセス内に保持するキャッシュの件数
+RESPONSE_FACTOR_MEMORY_CACHE_SIZE = 1024
+# 計算方法を変更したときにキャッシュを無効にするためのバージョン
+_RESPONSE_FACTOR_CACHE_VERSION = 1
+
+# キーは（キャッシュの保存先, calc_response_factor_keyのキー）
+_response_factor_memory_cache: 'OrderedDict[Tuple[str, str], Dict[str, np.ndarray]]' = OrderedDict()
+
+
+def calc_response_factor_key(rs: np.ndarray, cs: np.ndarray, i_max: int, delta_t: float, n_max: int) -> str:
+
+    """壁体構成と計算条件から応答係数キャッシュのキーを計算する
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        i_max: 根を探索する上限数
+        delta_t: 応答係数を計算する時間間隔[s]
+        n_max: 二等辺三角波励振の応答係数を計算する項数
+
+    Returns:
+        key: キャッシュのキー（SHA-256）
+    """
+
+    h = hashlib.sha256()
+    h.update(str(_RESPONSE_FACTOR_CACHE_VERSION).encode())
+    h.update(np.ascontiguousarray(rs, dtype='<f8').tobytes())
+    h.update(b'|')
+    h.update(np.ascontiguousarray(cs, dtype='<f8').tobytes())
+    h.update('|{0}|{1!r}|{2}'.format(int(i_max), float(delta_t), int(n_max)).encode())
+
+    return h.hexdigest()
+
+
+def _calc_response_factor_set(rs: np.ndarray, cs: np.ndarray, i_max: int, delta_t: float, n_max: int) \
+    -> Dict[str, np.ndarray]:
+
+    """キャッシュに保存する応答係数一式を計算する"""
+
+    a0, aa, at, alpha = calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=i_max)
+    rft_a, rft_t, r, rft1_a, rft1_t = calc_triangle_response_factor(
+        aa=aa, at=at, alpha=alpha, a0=a0, n_max=n_max, delta_t=delta_t)
+    cyclic_phi_t = calc_cyclic_response_factor(at=at, alpha=alpha, a0=a0, delta_t=delta_t)
+
+    return {
+        'a0': np.asarray(a0),
+        'aa': aa,
+        'at': at,
+        'alpha': alpha,
+        'rft_a': rft_a,
+        'rft_t': rft_t,
+        'r': r,
+        'rft1_a': rft1_a,
+        'rft1_t': rft1_t,
+        'cyclic_phi_t': cyclic_phi_t
+    }
+
+
+def _remember_response_factor(key: Tuple[str, str], factors: Dict[str, np.ndarray]) -> None:
+
+    """プロセス内のLRUキャッシュに応答係数を登録する"""
+
+    for v in factors.values():
+        v.flags.writeable = False
+    _response_factor_memory_cache[key] = factors
+    _response_factor_memory_cache.move_to_end(key)
+    while len(_response_factor_memory_cache) > RESPONSE_FACTOR_MEMORY_CACHE_SIZE:
+        _response_factor_memory_cache.popitem(last=False)
+
+
+def clear_response_factor_memory_cache() -> None:
+
+    """プロセス内のLRUキャッシュを空にする（ディスク上のキャッシュは残す）"""
+
+    _response_factor_memory_cache.clear()
+
+
+def load_response_factor(rs: np.ndarray, cs: np.ndarray, i_max: int, delta_t: float, n_max: int = 50,
+                         cache_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+
+    """キャッシュを使って壁体の応答係数一式を取得する
+        プロセス内のLRUキャッシュ、ディスク上の.npzファイルの順に探し、無ければ計算して保存する
+        保存先に書き込めない場合は保存せずに計算結果を返す
+        ファイルは一時ファイルに書いてから置き換えるため、複数のプロセスから同時に使用してよい
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        i_max: 根を探索する上限数
+        delta_t: 応答係数を計算する時間間隔[s]
+        n_max: 二等辺三角波励振の応答係数を計算する項数
+        cache_dir: キャッシュの保存先（Noneの場合はRESPONSE_FACTOR_CACHE_DIR）
+
+    Returns:
+        factors: 応答係数の辞書（書き換え不可）
+            a0, aa, at, alpha: calc_alpha_matsuo_methodの結果
+            rft_a, rft_t, r, rft1_a, rft1_t: calc_triangle_response_factorの結果
+            cyclic_phi_t: calc_cyclic_response_factorの結果
+    """
+
+    rs = np.asarray(rs, dtype=float)
+    cs = np.asarray(cs, dtype=float)
+    key = calc_response_factor_key(rs=rs, cs=cs, i_max=i_max, delta_t=delta_t, n_max=n_max)
+
+    if cache_dir is None:
+        cache_dir = RESPONSE_FACTOR_CACHE_DIR
+    cache_dir = os.path.abspath(cache_dir)
+    file_path = os.path.join(cache_dir, key[:2], key + '.npz')
+
+    # プロセス内のキャッシュ（保存先ごとに分ける）
+    memory_key = (cache_dir, key)
+    factors = _response_factor_memory_cache.get(memory_key)
+    if factors is not None:
+        _response_factor_memory_cache.move_to_end(memory_key)
+        return factors
+
+    # ディスク上のキャッシュ
+    try:
+        with np.load(file_path) as f:
+            factors = {name: f[name] for name in f.files}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        factors = None
+
+    if factors is None:
+        factors = _calc_response_factor_set(rs=rs, cs=cs, i_max=i_max, delta_t=delta_t, n_max=n_max)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.npz', dir=os.path.dirname(file_path))
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **factors)
+            # 同じキーは同じ内容なので、後から書いたプロセスが置き換えてもよい
+            os.replace(temp_path, file_path)
+        except OSError:
+            # 保存先に書き込めない場合は保存せずに計算結果だけを使う
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    _remember_response_factor(memory_key, factors)
+
+    return factors
@@ -0,0 +1,243 @@
+import numpy as np
+from typing import Tuple, Union
+
+def calc_cyclic_response_factor(at: np.ndarray, alpha: np.ndarray, a0: float, delta_t: float, n_0: int = 24)\
+    -> np.ndarray:
+    """周期定常の応答係数を計算する
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        delta_t: 単位応答を計算する時間間隔[s]
+        n_0: 1周期のStep数
+
+    Returns:
+        cyclic_phi_t: 周期定常の応答係数[W/(m2 K)]
+    """
+
+    ald = alpha * delta_t
+    temp = np.exp(- ald)
+    cyclic_phi_t = np.zeros(n_0, dtype=float)
+    cyclic_phi_t[0] = a0 + np.sum(
+        at / ald * (1.0 - temp - (1.0 - temp) ** 2 * np.exp(- (float(n_0) - 1.0) * ald) / (1.0 - np.exp(- n_0 * ald)))
+        )
+    # 2項目以降は公比tempの等比数列
+    j = np.arange(1, n_0, dtype=float)
+    cyclic_phi_t[1:] = - np.exp(- np.multiply.outer(j - 1.0, ald)) \
+        @ (at / ald * (1.0 - temp) ** 2 / (1.0 - np.exp(- n_0 * ald)))
+
+    return cyclic_phi_t
+
+
+def calc_periodic_response(theta: np.ndarray, a: np.ndarray, alpha: np.ndarray, a0: Union[float, np.ndarray],
+                           delta_t: float) -> np.ndarray:
+    """周期定常状態の室内表面熱流をFFTで計算する
+        温度の1周期分を与えると、同じ温度変化が無限に繰り返されたときの熱流を直接求める
+        周期定常の応答係数（calc_cyclic_response_factor）との循環畳み込みと同じ結果となる
+        theta: 1周期分の温度[℃] (n_0,)、壁体ごとに異なる場合は(n_walls, n_0)
+        a: 吸熱応答または貫流応答のパラメータ (n_alpha,)、壁体ごとに異なる場合は(n_walls, n_alpha)
+        alpha: 根[1/s] aと同じ形状（留数が0の項は根の値によらず無視される）
+        a0: 定常項（熱貫流率）[W/(m2 K)] スカラー、壁体ごとに異なる場合は(n_walls,)
+        delta_t: 計算の時間間隔[s]
+
+    Returns:
+        q: 室内表面熱流[W/m2] (n_0,)、壁体ごとに異なる場合は(n_walls, n_0)
+    """
+
+    theta = np.asarray(theta, dtype=float)
+    a = np.asarray(a, dtype=float)
+    ald = np.asarray(alpha, dtype=float) * delta_t
+    # 埋め草の項で0除算しないようにする
+    ald = np.where(a == 0.0, 1.0, ald)
+    n_0 = theta.shape[-1]
+
+    # 指数項別応答係数
+    r = np.exp(- ald)
+    rft0 = np.asarray(a0, dtype=float) + np.sum(a / ald * (1.0 - r), axis=-1)
+    rft1 = - a / ald * (1.0 - r) ** 2
+
+    # 各周波数における伝達関数 rft0 + Σ rft1 z^-1 / (1 - r z^-1)
+    z_inv = np.exp(-2.0j * np.pi * np.arange(n_0 // 2 + 1) / n_0)
+    h = np.multiply.outer(rft0, np.ones_like(z_inv))
+    for k in range(a.shape[-1]):
+        r_k = r[..., k, np.newaxis]
+        h = h + rft1[..., k, np.newaxis] * z_inv / (1.0 - r_k * z_inv)
+
+    return np.fft.irfft(h * np.fft.rfft(theta, axis=-1), n=n_0, axis=-1)
+
+
+def calc_step_respose_factor(aa: np.ndarray, at: np.ndarray, alpha: np.ndarray, a0: float, n_max: int, delta_t: float)\
+    -> Tuple[np.ndarray, np.ndarray]:
+
+    """単位応答を求める
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        n_max: 単位応答を計算する項数
+        delta_t: 単位応答を計算する時間間隔[s]
+
+    Returns:
+        phi_a: 吸熱単位応答[W/(m2 K)]
+        phi_t: 貫流単位応答[W/(m2 K)]
+    """
+    
+    phi_a = np.zeros(n_max)
+    phi_t = np.zeros(n_max)
+
+    # 単位応答の計算
+    for n in range(n_max):
+        phi_a[n] = a0 + np.sum(aa * np.exp(-alpha * delta_t * n))
+        phi_t[n] = a0 + np.sum(at * np.exp(-alpha * delta_t * n))
+    
+    return (phi_a, phi_t)
+
+
+def calc_triangle_response_factor(aa: np.ndarray, at: np.ndarray, alpha: np.ndarray, a0: float, n_max: int, delta_t: float)\
+        -> Tuple[np.ndarray, np.ndarray]:
+    
+    """二等辺三角波励振の応答係数を計算する
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        n_max: 単位応答を計算する項数
+        delta_t: 単位応答を計算する時間間隔[s]
+
+    Returns:
+        rft_a: 吸熱単位応答[W/(m2 K)]
+        rft_t: 貫流単位応答[W/(m2 K)]
+    """
+    
+    rft_a = np.zeros(n_max)
+    rft_t = np.zeros(n_max)
+
+    # 初項の計算
+    rft_a[0] = a0 + np.sum(aa / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)))
+    rft_t[0] = a0 + np.sum(at / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)))
+
+    # 2項目以降の計算
+    for j in range(1, n_max):
+        
+        rft_a[j] = - np.sum(aa / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)) ** 2 * np.exp(-(float(j) - 1) * alpha * delta_t))
+        rft_t[j] = - np.sum(at / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)) ** 2 * np.exp(-(float(j) - 1) * alpha * delta_t))
+
+    # 公比の計算
+    r = np.exp(- alpha * delta_t)
+
+    # 指数項別応答係数の計算
+    rft1_a = - aa / (alpha * delta_t) * (1.0 - r) ** 2
+    rft1_t = - at / (alpha * delta_t) * (1.0 - r) ** 2
+    return rft_a, rft_t, r, rft1_a, rft1_t
+
+
+def calc_triangle_response_factor_terms(aa: np.ndarray, at: np.ndarray, alpha: np.ndarray, a0: float, delta_t: float)\
+        -> Tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
+    
+    """二等辺三角波励振の応答係数を初項と指数項別応答係数で計算する
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        delta_t: 単位応答を計算する時間間隔[s]
+
+    Returns:
+        rft_a0: 吸熱単位応答の初項[W/(m2 K)]
+        rft_t0: 貫流単位応答の初項[W/(m2 K)]
+        rfa_1: 指数項別吸熱応答係数[W/(m2･K)]
+        rft_1: 指数項別貫流応答係数[W/(m2･K)]
+        Row: 公比
+    """
+    
+    # 初項の計算
+    rft_a0 = a0 + np.sum(aa / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)))
+    rft_t0 = a0 + np.sum(at / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)))
+
+    # 指数項別応答係数の計算
+    temp = 1.0 / (alpha * delta_t) * (1.0 - np.exp(- alpha * delta_t)) ** 2.0
+    rft_t1 = - at * temp
+    rft_a1 = - aa * temp
+
+    Row = np.exp(- alpha * delta_t)
+
+    return rft_a0, rft_t0, rft_a1, rft_t1, Row
+
+
+def _calc_power_table(alpha: np.ndarray, n_max: int, delta_t: Union[float, np.ndarray]) -> np.ndarray:
+
+    """公比r=exp(-alpha*delta_t)のべき乗表を計算する
+        alpha: 根[1/s] (n_alpha,)
+        n_max: べき乗の項数
+        delta_t: 時間間隔[s] (n_dt,)
+
+    Returns:
+        r_n: r**n (n_dt, n_max, n_alpha)
+    """
+
+    ald = - np.multiply.outer(np.atleast_1d(delta_t), alpha)
+    return np.exp(np.arange(n_max, dtype=float)[np.newaxis, :, np.newaxis] * ald[:, np.newaxis, :])
+
+
+def calc_step_response_factor_matrix(aa: np.ndarray, at: np.ndarray, alpha: np.ndarray, a0: float, n_max: int,
+                                     delta_t: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+
+    """単位応答を複数の時間間隔について一括で求める（calc_step_respose_factorの配列版）
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        n_max: 単位応答を計算する項数
+        delta_t: 単位応答を計算する時間間隔[s]（スカラーまたは(n_dt,)の配列）
+
+    Returns:
+        phi_a: 吸熱単位応答[W/(m2 K)] (n_dt, n_max)、delta_tがスカラーの場合は(n_max,)
+        phi_t: 貫流単位応答[W/(m2 K)] (n_dt, n_max)、delta_tがスカラーの場合は(n_max,)
+    """
+
+    r_n = _calc_power_table(alpha=alpha, n_max=n_max, delta_t=delta_t)
+
+    phi_a = a0 + r_n @ aa
+    phi_t = a0 + r_n @ at
+
+    if np.ndim(delta_t) == 0:
+        return (phi_a[0], phi_t[0])
+    return (phi_a, phi_t)
+
+
+def calc_triangle_response_factor_matrix(aa: np.ndarray, at: np.ndarray, alpha: np.ndarray, a0: float, n_max: int,
+                                         delta_t: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+
+    """二等辺三角波励振の応答係数を複数の時間間隔について一括で計算する（calc_triangle_response_factorの配列版）
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        n_max: 応答係数を計算する項数
+        delta_t: 応答係数を計算する時間間隔[s]（スカラーまたは(n_dt,)の配列）
+
+    Returns:
+        rft_a: 吸熱応答係数[W/(m2 K)] (n_dt, n_max)、delta_tがスカラーの場合は(n_max,)
+        rft_t: 貫流応答係数[W/(m2 K)] (n_dt, n_max)、delta_tがスカラーの場合は(n_max,)
+    """
+
+    ald = np.multiply.outer(np.atleast_1d(delta_t), alpha)
+    r = np.exp(- ald)
+
+    # 2項目以降はr**(j-1)の等比数列
+    r_n = _calc_power_table(alpha=alpha, n_max=max(n_max - 1, 0), delta_t=delta_t)
+    w_a = aa / ald * (1.0 - r) ** 2
+    w_t = at / ald * (1.0 - r) ** 2
+
+    rft_a = np.empty((len(ald), n_max))
+    rft_t = np.empty((len(ald), n_max))
+
+    # 初項の計算
+    rft_a[:, 0] = a0 + np.sum(aa / ald * (1.0 - r), axis=1)
+    rft_t[:, 0] = a0 + np.sum(at / ald * (1.0 - r), axis=1)
+
+    # 2項目以降の計算
+    rft_a[:, 1:] = - np.einsum('dna,da->dn', r_n, w_a)
+    rft_t[:, 1:] = - np.einsum('dna,da->dn', r_n, w_t)
+
+    if np.ndim(delta_t) == 0:
+        return (rft_a[0], rft_t[0])
+    return (rft_a, rft_t)
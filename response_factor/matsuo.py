@@ -0,0 +1,522 @@
+import numpy as np
+import math
+import functools
+import warnings
+from typing import Callable, List, Optional, Tuple
+
+def _calc_root_matsuo_method(rs: np.ndarray, cs: np.ndarray, rcs: np.ndarray, alpha: np.ndarray, i: int) \
+    -> Tuple[float, float, float]:
+
+    """ 既に求めたi個の根で減次して、次の根をNewton法で求める
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        rcs: 時定数[s]
+        alpha: 既に求めた根[1/s]（先頭のi個を使う）
+        i: 既に求めた根の数
+
+    Returns:
+        alpha_i: 根[1/s]
+        aa_i: 吸熱応答のパラメータ
+        at_i: 貫流応答のパラメータ
+    """
+
+    # 多層壁の層数
+    n_layers = len(rs)
+
+    d = np.zeros((n_layers, 4), dtype=float)
+    dd = np.zeros((n_layers, 4), dtype=float)
+    cd = np.zeros((n_layers, 4), dtype=float)
+    cdd = np.zeros((n_layers, 4), dtype=float)
+    for k in range(n_layers):
+        d[k, 0] = 1.0
+        d[k, 1] = rs[k]
+        d[k, 2] = 0.0
+        d[k, 3] = 1.0
+        dd[k, 0] = 0.5 * rcs[k]
+        dd[k, 1] = rs[k] * rcs[k] / 6.0
+        dd[k, 2] = cs[k]
+        dd[k, 3] = dd[k, 0]
+
+    s = 0.0
+    mm = 0
+    for j in range(9999):
+        cd[0, :] = d[0, :]
+        cdd[0, :] = d[0, :]
+        for k in range(1, n_layers):
+            cd[k, 0] = cd[k-1, 0] * d[k, 0] + cd[k-1, 1] * d[k, 2]
+            cd[k, 1] = cd[k-1, 0] * d[k, 1] + cd[k-1, 1] * d[k, 0]
+            cd[k, 2] = cd[k-1, 2] * d[k, 0] + cd[k-1, 3] * d[k, 2]
+            cd[k, 3] = cd[k-1, 2] * d[k, 1] + cd[k-1, 3] * d[k, 0]
+            cdd[k, 0] = cd[k-1, 0] * dd[k, 0] + cdd[k-1, 0] * d[k, 0] \
+                + cd[k-1, 1] * dd[k, 2] + cdd[k-1, 1] * d[k, 2]
+            cdd[k, 1] =  cd[k-1, 0] * dd[k, 1] + cdd[k-1, 0] * d[k, 1] \
+                + cd[k-1, 1] * dd[k, 0] + cdd[k-1, 1] * d[k, 0]
+            cdd[k, 2] = cd[k-1, 2] * dd[k, 0] + cdd[k-1, 2] * d[k, 0] \
+                + cd[k-1, 3] * dd[k, 2] + cdd[k-1, 3] * d[k, 2]
+            cdd[k, 3] =  cd[k-1, 2] * dd[k, 1] + cdd[k-1, 2] * d[k, 1] \
+                + cd[k-1, 3] * dd[k, 0] + cdd[k-1, 3] * d[k, 0]
+        
+        y = cd[n_layers-1, 1]
+        yd = cdd[n_layers-1, 1]
+
+        w1 = 0.0
+        w2 = 0.0
+        if i != 0:
+            w1 = 0.0
+            for j in range(i):
+                w2 = s + alpha[j]
+                w1 += 1.0 / w2
+            yd -= y * w1
+        
+        s1 = s - y / yd
+        if s1 < s:
+
+            s = s1
+            for k in range(n_layers):
+                if cs[k] > 0.0:
+                    w1 = math.sqrt(- s * rcs[k])
+                    w2 = math.cos(w1)
+                    w3 = math.sin(w1)
+
+                    d[k, 0] = w2
+                    d[k, 1] = rs[k] * w3 / w1
+                    d[k, 2] = - w1 * w3 / rs[k]
+                    d[k, 3] = w2
+
+                    dd[k, 0] = 0.5 * rcs[k] * w3 / w1
+                    dd[k, 1] = 0.5 * rs[k] * rcs[k] * (w3 / w1 - w2) / w1 ** 2
+                    dd[k, 2] = 0.5 * cs[k] * (w3 / w1 + w2)
+                    dd[k, 3] = dd[k, 0]
+
+                    mm = 0
+        else:
+            s = s1
+            mm = 1
+            break
+
+        if mm == 1:
+            break
+    
+    alpha_i = - s1
+    at_i = 1.0 / (s1 * cdd[n_layers-1, 1])
+    aa_i = cd[n_layers - 1, 3] * at_i
+
+    return (alpha_i, aa_i, at_i)
+
+
+# calc_alpha_matsuo_method_adaptiveで最初に求める根の数と、残りの根の寄与の見積もりに掛ける余裕
+_N_ROOTS_INITIAL = 16
+_ROOT_TAIL_SAFETY = 2.0
+
+
+@functools.lru_cache(maxsize=None)
+def _load_numba_kernel() -> Optional[Callable]:
+
+    """Numbaでコンパイルした根の計算関数を読み込む（Numbaが使えない場合はNone）"""
+
+    try:
+        from ._matsuo_numba import calc_alpha_matsuo_method_kernel
+    except ImportError:
+        return None
+
+    return calc_alpha_matsuo_method_kernel
+
+
+def calc_alpha_matsuo_method(rs: np.ndarray, cs: np.ndarray, i_max: int, backend: str = 'python') \
+    -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+
+    """ 留数定理で根を求める
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        i_max: 根を探索する上限数
+        backend: 'python'またはNumbaでコンパイルした関数を使う場合は'numba'
+            Numbaが使えない場合は警告を出して'python'で計算する
+
+    Returns:
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+    """
+
+    if backend == 'numba':
+        kernel = _load_numba_kernel()
+        if kernel is not None:
+            aa, at, alpha = kernel(
+                np.ascontiguousarray(rs, dtype=float), np.ascontiguousarray(cs, dtype=float), i_max)
+            return (1.0 / np.sum(rs), aa, at, alpha)
+        warnings.warn('numba is not available; falling back to the python backend', RuntimeWarning)
+    elif backend != 'python':
+        raise ValueError("backend must be 'python' or 'numba'")
+
+    # 根を入れるNumpy配列
+    alpha = np.zeros(i_max)
+    # 貫流応答、吸熱応答パラメータを入れるNumpy配列
+    aa = np.zeros(i_max)
+    at = np.zeros(i_max)
+
+    # 熱貫流率の計算[W/(m2･K)]
+    a0 = 1.0 / np.sum(rs)
+
+    # 時定数の計算[1/s]
+    rcs = rs * cs
+
+    for i in range(i_max):
+        alpha[i], aa[i], at[i] = _calc_root_matsuo_method(rs=rs, cs=cs, rcs=rcs, alpha=alpha, i=i)
+    
+    return (a0, aa, at, alpha)
+
+
+def _estimate_root_tail(a: np.ndarray, alpha: np.ndarray, tau: float, delta_t: float) -> float:
+
+    """ 求めた根より後の根による、二等辺三角波励振の応答係数の各項の絶対値の合計を見積もる
+        a: 根ごとの吸熱応答、貫流応答のパラメータの絶対値の大きい方
+        alpha: 根[1/s]（小さい順）
+        tau: 各層の√(熱抵抗×熱容量)の合計[√s]
+        delta_t: 応答係数を計算する時間間隔[s]
+
+    Returns:
+        tail: 見積もった合計[W/(m2 K)]
+    """
+
+    # sより小さい根の数は τ √s / π で近似でき、後半の根のパラメータは alpha^(-p) に比例して減少するとする
+    # pは求めた根の後ろから1/2と、1/4～1/2の範囲のパラメータの最大値の比から決める（0～1の範囲とする）
+    m = len(alpha)
+    a1, alpha1 = a[m // 4:m // 2], alpha[m // 4:m // 2]
+    a2, alpha2 = a[m // 2:], alpha[m // 2:]
+    if np.max(a2) == 0.0:
+        return 0.0
+    if len(a1) > 0 and np.max(a1) > 0.0:
+        p = math.log(np.max(a1) / np.max(a2)) / math.log(math.sqrt(alpha2[0] * alpha2[-1] / (alpha1[0] * alpha1[-1])))
+        p = min(max(p, 0.0), 1.0)
+    else:
+        p = 0.0
+    b = np.max(a2 * alpha2 ** p)
+
+    # 1つの根の寄与は 2 a (1 - exp(-α Δt)) / (α Δt) ≦ 2 a min(1, 1 / (α Δt)) で、
+    # 最後の根の直後にもう1つ根があるとして、それより後は根の分布で積分する
+    alpha_m = alpha[-1]
+    alpha_c = max(alpha_m, 1.0 / delta_t)
+    if abs(p - 0.5) < 1.0e-9:
+        integral = math.log(alpha_c / alpha_m)
+    else:
+        integral = (alpha_c ** (0.5 - p) - alpha_m ** (0.5 - p)) / (0.5 - p)
+    integral += alpha_c ** (- p - 0.5) / (p + 0.5) / delta_t
+
+    return 2.0 * b * (alpha_m ** (- p) * min(1.0, 1.0 / (alpha_m * delta_t)) + tau / (2.0 * math.pi) * integral)
+
+
+def calc_alpha_matsuo_method_adaptive(rs: np.ndarray, cs: np.ndarray, delta_t: float, tol: float = 1.0e-4,
+                                      ald_max: Optional[float] = None, i_max: int = 1000, backend: str = 'python') \
+    -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+
+    """ 留数定理で根を求める（打ち切った根による応答係数の誤差がtol以下となる数だけ求める）
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        delta_t: 二等辺三角波励振の応答係数を計算する時間間隔[s]
+        tol: 打ち切りによる二等辺三角波励振の応答係数（吸熱、貫流それぞれ）の誤差の
+            各項の絶対値の合計を熱貫流率で割った値の許容値
+            求めた根より後の根の寄与は根の分布とパラメータの減少から見積もり（_ROOT_TAIL_SAFETY倍の余裕を見る）、
+            求めた根の寄与はそのまま合計する
+        ald_max: alpha*delta_tの上限（Noneの場合は判定しない）
+        i_max: 根を探索する上限数
+        backend: 'python'またはNumbaでコンパイルした関数を使う場合は'numba'（calc_alpha_matsuo_method参照）
+
+    Returns:
+        a0: 定常項（熱貫流率）[W/(m2 K)]
+        aa: 吸熱応答のパラメータ
+        at: 貫流応答のパラメータ
+        alpha: 根[1/s]
+            i_maxまで求めてもtolを満たさない場合、ald_maxで根が打ち切られてtolを満たさない場合は警告を出す
+    """
+
+    rs = np.asarray(rs, dtype=float)
+    cs = np.asarray(cs, dtype=float)
+    tau = float(np.sum(np.sqrt(rs * cs)))
+
+    # 根の数を倍にしながら、残りの根の寄与の見積もりが許容値の半分以下となるまで求める
+    n_roots = min(_N_ROOTS_INITIAL, i_max)
+    while True:
+        a0, aa, at, alpha = calc_alpha_matsuo_method(rs=rs, cs=cs, i_max=n_roots, backend=backend)
+        n = n_roots
+        if ald_max is not None:
+            n = int(np.searchsorted(alpha * delta_t, ald_max, side='right'))
+        a = np.maximum(np.abs(aa[:n]), np.abs(at[:n]))
+        tail = _ROOT_TAIL_SAFETY * _estimate_root_tail(a=a, alpha=alpha[:n], tau=tau, delta_t=delta_t) \
+            if n > 0 else 0.0
+        if tail <= 0.5 * tol * a0 or n < n_roots or n_roots >= i_max:
+            break
+        n_roots = min(2 * n_roots, i_max)
+
+    if tail > tol * a0:
+        warnings.warn('the truncated roots may exceed tol (estimated {0:.3e}, {1} roots)'.format(tail / a0, n),
+                      RuntimeWarning)
+        return (a0, aa[:n], at[:n], alpha[:n])
+
+    # 末尾の根から順に、打ち切る根の寄与と残りの根の見積もりの合計が許容値以下となる数まで減らす
+    ald = alpha[:n] * delta_t
+    contribution = 2.0 * a * (1.0 - np.exp(- ald)) / ald
+    error = tail + np.cumsum(contribution[::-1])[::-1]
+    n = int(np.argmax(error <= tol * a0)) if np.any(error <= tol * a0) else n
+
+    return (a0, aa[:n], at[:n], alpha[:n])
+
+
+def stack_walls(rs_list: List[np.ndarray], cs_list: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+
+    """層数の異なる壁体の熱抵抗、熱容量を(壁体数, 最大層数)の配列にまとめる
+        rs_list: 壁体ごとの熱抵抗（室内側から）[m2 K/W]
+        cs_list: 壁体ごとの熱容量（室内側から）[J/(m2 K)]
+
+    Returns:
+        rs: 熱抵抗[m2 K/W]（不足する層は熱抵抗0、熱容量0の層で埋める）
+        cs: 熱容量[J/(m2 K)]
+    """
+
+    n_walls = len(rs_list)
+    n_layers = max(len(r) for r in rs_list)
+
+    rs = np.zeros((n_walls, n_layers), dtype=float)
+    cs = np.zeros((n_walls, n_layers), dtype=float)
+    for w, (r, c) in enumerate(zip(rs_list, cs_list)):
+        rs[w, :len(r)] = r
+        cs[w, :len(c)] = c
+
+    return rs, cs
+
+
+def _calc_layer_matrix(rs: np.ndarray, cs: np.ndarray, rcs: np.ndarray, s: np.ndarray,
+                       d: np.ndarray, dd: np.ndarray) -> None:
+
+    """熱容量をもつ層の4端子行列とそのsによる微分を更新する
+        rs: 熱抵抗[m2 K/W] (n_walls, n_layers)
+        cs: 熱容量[J/(m2 K)] (n_walls, n_layers)
+        rcs: 時定数 (n_walls, n_layers)
+        s: 現在のs (n_walls,)
+        d: 4端子行列 (n_walls, n_layers, 4)（上書きされる）
+        dd: 4端子行列の微分 (n_walls, n_layers, 4)（上書きされる）
+    """
+
+    w, k = np.nonzero(cs > 0.0)
+    if len(w) == 0:
+        return
+
+    r = rs[w, k]
+    c = cs[w, k]
+    rc = rcs[w, k]
+    w1 = np.sqrt(- s[w] * rc)
+    w2 = np.cos(w1)
+    w3 = np.sin(w1)
+
+    d[w, k, 0] = w2
+    d[w, k, 1] = r * w3 / w1
+    d[w, k, 2] = - w1 * w3 / r
+    d[w, k, 3] = w2
+
+    dd[w, k, 0] = 0.5 * rc * w3 / w1
+    dd[w, k, 1] = 0.5 * r * rc * (w3 / w1 - w2) / w1 ** 2
+    dd[w, k, 2] = 0.5 * c * (w3 / w1 + w2)
+    dd[w, k, 3] = dd[w, k, 0]
+
+
+def calc_alpha_matsuo_method_batch(rs: np.ndarray, cs: np.ndarray, i_max: int) \
+    -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+    """ 留数定理で複数の壁体の根を一括で求める（calc_alpha_matsuo_methodの壁体方向の配列版）
+        rs: 熱抵抗（室内側から）[m2 K/W] (n_walls, n_layers)
+        cs: 熱容量（室内側から）[J/(m2 K)] (n_walls, n_layers)
+            層数の異なる壁体は熱抵抗0、熱容量0の層で埋める（stack_walls参照）
+        i_max: 根を探索する上限数
+
+    Returns:
+        a0: 定常項（熱貫流率）[W/(m2 K)] (n_walls,)
+        aa: 吸熱応答のパラメータ (n_walls, i_max)
+        at: 貫流応答のパラメータ (n_walls, i_max)
+        alpha: 根[1/s] (n_walls, i_max)
+    """
+
+    rs = np.atleast_2d(np.asarray(rs, dtype=float))
+    cs = np.atleast_2d(np.asarray(cs, dtype=float))
+    n_walls, n_layers = rs.shape
+
+    # 根を入れるNumpy配列
+    alpha = np.zeros((n_walls, i_max))
+    # 貫流応答、吸熱応答パラメータを入れるNumpy配列
+    aa = np.zeros((n_walls, i_max))
+    at = np.zeros((n_walls, i_max))
+
+    # 熱貫流率の計算[W/(m2･K)]
+    a0 = 1.0 / np.sum(rs, axis=1)
+
+    # 時定数の計算[1/s]
+    rcs = rs * cs
+
+    # s=0における4端子行列とその微分
+    d0 = np.zeros((n_walls, n_layers, 4), dtype=float)
+    dd0 = np.zeros((n_walls, n_layers, 4), dtype=float)
+    d0[:, :, 0] = 1.0
+    d0[:, :, 1] = rs
+    d0[:, :, 3] = 1.0
+    dd0[:, :, 0] = 0.5 * rcs
+    dd0[:, :, 1] = rs * rcs / 6.0
+    dd0[:, :, 2] = cs
+    dd0[:, :, 3] = dd0[:, :, 0]
+
+    cd = np.zeros((n_walls, n_layers, 4), dtype=float)
+    cdd = np.zeros((n_walls, n_layers, 4), dtype=float)
+
+    for i in range(i_max):
+        d = d0.copy()
+        dd = dd0.copy()
+
+        s = np.zeros(n_walls)
+        s1 = np.zeros(n_walls)
+        # Newton法の反復を続けている壁体
+        active = np.arange(n_walls)
+        for j in range(9999):
+            da = d[active]
+            dda = dd[active]
+            cda = cd[active]
+            cdda = cdd[active]
+            cda[:, 0, :] = da[:, 0, :]
+            cdda[:, 0, :] = da[:, 0, :]
+            for k in range(1, n_layers):
+                p = cda[:, k-1, :]
+                pd = cdda[:, k-1, :]
+                q = da[:, k, :]
+                qd = dda[:, k, :]
+                cda[:, k, 0] = p[:, 0] * q[:, 0] + p[:, 1] * q[:, 2]
+                cda[:, k, 1] = p[:, 0] * q[:, 1] + p[:, 1] * q[:, 0]
+                cda[:, k, 2] = p[:, 2] * q[:, 0] + p[:, 3] * q[:, 2]
+                cda[:, k, 3] = p[:, 2] * q[:, 1] + p[:, 3] * q[:, 0]
+                cdda[:, k, 0] = p[:, 0] * qd[:, 0] + pd[:, 0] * q[:, 0] \
+                    + p[:, 1] * qd[:, 2] + pd[:, 1] * q[:, 2]
+                cdda[:, k, 1] = p[:, 0] * qd[:, 1] + pd[:, 0] * q[:, 1] \
+                    + p[:, 1] * qd[:, 0] + pd[:, 1] * q[:, 0]
+                cdda[:, k, 2] = p[:, 2] * qd[:, 0] + pd[:, 2] * q[:, 0] \
+                    + p[:, 3] * qd[:, 2] + pd[:, 3] * q[:, 2]
+                cdda[:, k, 3] = p[:, 2] * qd[:, 1] + pd[:, 2] * q[:, 1] \
+                    + p[:, 3] * qd[:, 0] + pd[:, 3] * q[:, 0]
+            cd[active] = cda
+            cdd[active] = cdda
+
+            sa = s[active]
+            y = cda[:, n_layers-1, 1]
+            yd = cdda[:, n_layers-1, 1]
+
+            # 既に求めた根による減次
+            if i != 0:
+                yd = yd - y * np.sum(1.0 / (sa[:, np.newaxis] + alpha[active, :i]), axis=1)
+
+            s1a = sa - y / yd
+            s1[active] = s1a
+
+            # sが減少しなくなった壁体は収束
+            is_descent = s1a < sa
+            s[active] = s1a
+            active = active[is_descent]
+            if len(active) == 0:
+                break
+
+            sub_d = d[active]
+            sub_dd = dd[active]
+            _calc_layer_matrix(rs[active], cs[active], rcs[active], s[active], sub_d, sub_dd)
+            d[active] = sub_d
+            dd[active] = sub_dd
+
+        alpha[:, i] = - s1
+        at[:, i] = 1.0 / (s1 * cdd[:, n_layers-1, 1])
+        aa[:, i] = cd[:, n_layers-1, 3] * at[:, i]
+
+    return (a0, aa, at, alpha)
+
+
+def calc_Bs(rs: np.ndarray, cs: np.ndarray, alpha: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+
+    """計算された根の範囲内でB(s)を計算する
+        rs: 熱抵抗（室内側から）[m2 K/W]
+        cs: 熱容量（室内側から）[J/(m2 K)]
+        alpha: 根[1/s]
+    
+    Returns:
+        Bs: 壁体の4端子行列から求めたB(s)
+    """
+
+    n_layer = len(cs)
+    laps = np.logspace(np.log10(alpha[0]), np.log10(alpha[-1]), 1000)
+    rcs = rs * cs
+    Bsarray = np.zeros(len(laps))
+
+    for k, lap in enumerate(laps):
+        Ft = np.identity(2, dtype=float)
+
+        for i in range(n_layer):
+            Fi = np.zeros((2, 2), dtype=float)
+            if cs[i] < 0.0001:
+                Fi[0, 0] = 1.0
+                Fi[0, 1] = rs[i]
+                Fi[1, 0] = 0.0
+                Fi[1, 1] = 1.0
+            else:
+                temp = np.sqrt(rcs[i] * lap)
+                Fi[0, 0] = np.cos(temp)
+                Fi[0, 1] = rs[i] / temp * np.sin(temp)
+                Fi[1, 0] = - temp / rs[i] * np.sin(temp)
+                Fi[1, 1] = np.cos(temp)
+            
+            Ft = np.dot(Ft, Fi)
+
+            Bsarray[k] = Ft[0, 1]
+    
+    return laps, Bsarray
+
+
+def calc_Bs_batch(rs: np.ndarray, cs: np.ndarray, alpha: Optional[np.ndarray] = None,
+                  laps: Optional[np.ndarray] = None, n_points: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+
+    """B(s)を複数の壁体について一括で計算する（calc_Bsの配列版）
+        rs: 熱抵抗（室内側から）[m2 K/W] (n_layers,)、複数の壁体の場合は(n_walls, n_layers)
+        cs: 熱容量（室内側から）[J/(m2 K)] rsと同じ形状
+            層数の異なる壁体は熱抵抗0、熱容量0の層で埋める（stack_walls参照）
+        alpha: 根[1/s] (n_alpha,)、複数の壁体の場合は(n_walls, n_alpha)
+            lapsを与えない場合に、最初と最後の根の間を対数等間隔に分割してsを決める
+        laps: B(s)を計算するs (n_points,)、壁体ごとに異なる場合は(n_walls, n_points)
+        n_points: lapsを与えない場合の分割数
+
+    Returns:
+        laps: B(s)を計算したs
+        Bs: 壁体の4端子行列から求めたB(s) (n_points,)、複数の壁体の場合は(n_walls, n_points)
+    """
+
+    rs = np.asarray(rs, dtype=float)
+    cs = np.asarray(cs, dtype=float)
+
+    if laps is None:
+        alpha = np.asarray(alpha, dtype=float)
+        laps = np.logspace(np.log10(alpha[..., 0]), np.log10(alpha[..., -1]), n_points, axis=-1)
+    laps = np.asarray(laps, dtype=float)
+
+    # (..., n_points, n_layers)に揃える
+    lap = laps[..., :, np.newaxis]
+    r = rs[..., np.newaxis, :]
+    c = cs[..., np.newaxis, :]
+    shape = np.broadcast_shapes(lap.shape, r.shape)
+
+    # 熱容量のない層は熱抵抗のみの4端子行列とする
+    has_c = np.broadcast_to(c >= 0.0001, shape)
+    temp = np.sqrt(np.where(has_c, r * c * lap, 1.0))
+    cos_t = np.cos(temp)
+    sin_t = np.sin(temp)
+
+    f = np.empty(shape + (2, 2), dtype=float)
+    f[..., 0, 0] = np.where(has_c, cos_t, 1.0)
+    f[..., 0, 1] = np.where(has_c, r / temp * sin_t, r)
+    f[..., 1, 0] = np.where(has_c, - temp / np.where(r > 0.0, r, 1.0) * sin_t, 0.0)
+    f[..., 1, 1] = f[..., 0, 0]
+
+    # 室内側から順に4端子行列を掛ける
+    ft = f[..., 0, :, :]
+    for i in range(1, shape[-1]):
+        ft = ft @ f[..., i, :, :]
+
+    return laps, ft[..., 0, 1]
@@ -0,0 +1,115 @@
+import numpy as np
+from typing import List
+
+from .matsuo import calc_alpha_matsuo_method_batch, stack_walls
+
+class WallResponseSimulator:
+
+    """項別公比法により複数の壁体の室内表面熱流を時系列で計算する
+        各指数項の熱流q_dshを状態として保持するため、長い時系列を分割して順に与えてもよい
+    """
+
+    def __init__(self, rft0: np.ndarray, rft1: np.ndarray, r: np.ndarray):
+
+        """
+            rft0: 応答係数の初項[W/(m2 K)] (n_walls,)
+            rft1: 指数項別応答係数[W/(m2 K)] (n_walls, n_terms)
+            r: 公比 (n_walls, n_terms)
+                指数項の数が異なる壁体は、rft1、rともに0の項で埋める
+        """
+
+        rft1 = np.atleast_2d(np.asarray(rft1, dtype=float))
+        r = np.atleast_2d(np.asarray(r, dtype=float))
+
+        self.rft0 = np.atleast_1d(np.asarray(rft0, dtype=float))
+        # 時刻ごとの計算で壁体方向に連続となるよう(n_terms, n_walls)で保持する
+        self.rft1 = np.ascontiguousarray(rft1.T)
+        self.r = np.ascontiguousarray(r.T)
+        self.n_terms, self.n_walls = self.r.shape
+
+        # 指数項別の熱流[W/m2]
+        self.q_dsh = np.zeros((self.n_terms, self.n_walls))
+        self._temp = np.empty_like(self.q_dsh)
+
+    @classmethod
+    def from_roots(cls, a0: np.ndarray, a: np.ndarray, alpha: np.ndarray, delta_t: float) \
+        -> 'WallResponseSimulator':
+
+        """根と留数から作成する
+            a0: 定常項（熱貫流率）[W/(m2 K)] (n_walls,)
+            a: 吸熱応答または貫流応答のパラメータ (n_walls, n_alpha)
+            alpha: 根[1/s] (n_walls, n_alpha)（留数が0の項は根の値によらず無視される）
+            delta_t: 計算の時間間隔[s]
+        """
+
+        a0 = np.atleast_1d(np.asarray(a0, dtype=float))
+        a = np.atleast_2d(np.asarray(a, dtype=float))
+        ald = np.atleast_2d(np.asarray(alpha, dtype=float)) * delta_t
+        # 埋め草の項で0除算しないようにする
+        ald = np.where(a == 0.0, 1.0, ald)
+
+        r = np.exp(- ald)
+        rft0 = a0 + np.sum(a / ald * (1.0 - r), axis=1)
+        rft1 = - a / ald * (1.0 - r) ** 2
+
+        return cls(rft0=rft0, rft1=rft1, r=np.where(a == 0.0, 0.0, r))
+
+    @classmethod
+    def from_walls(cls, rs_list: List[np.ndarray], cs_list: List[np.ndarray], delta_t: float, i_max: int = 15,
+                   response: str = 't') -> 'WallResponseSimulator':
+
+        """壁体構成から作成する
+            rs_list: 壁体ごとの熱抵抗（室内側から）[m2 K/W]
+            cs_list: 壁体ごとの熱容量（室内側から）[J/(m2 K)]
+            delta_t: 計算の時間間隔[s]
+            i_max: 根を探索する上限数
+            response: 貫流応答の場合は't'、吸熱応答の場合は'a'
+        """
+
+        rs, cs = stack_walls(rs_list, cs_list)
+        a0, aa, at, alpha = calc_alpha_matsuo_method_batch(rs=rs, cs=cs, i_max=i_max)
+
+        if response == 't':
+            a = at
+        elif response == 'a':
+            a = aa
+        else:
+            raise ValueError("response must be 't' or 'a'")
+
+        return cls.from_roots(a0=a0, a=a, alpha=alpha, delta_t=delta_t)
+
+    def reset(self) -> None:
+
+        """指数項別の熱流を0に戻す"""
+
+        self.q_dsh[:] = 0.0
+
+    def run(self, theta: np.ndarray) -> np.ndarray:
+
+        """温度の時系列を与えて室内表面熱流を計算する
+            theta: 温度[℃] (n_walls, n_steps)、全壁体で共通の場合は(n_steps,)
+
+        Returns:
+            q: 室内表面熱流[W/m2] (n_walls, n_steps)
+        """
+
+        theta = np.asarray(theta, dtype=float)
+        if theta.ndim == 1:
+            theta = np.broadcast_to(theta[:, np.newaxis], (len(theta), self.n_walls))
+        else:
+            theta = np.ascontiguousarray(theta.T)
+
+        n_steps = theta.shape[0]
+        q = np.empty((n_steps, self.n_walls))
+        q_dsh = self.q_dsh
+        temp = self._temp
+
+        for t in range(n_steps):
+            theta_t = theta[t]
+            np.sum(q_dsh, axis=0, out=q[t])
+            q[t] += self.rft0 * theta_t
+            q_dsh *= self.r
+            np.multiply(self.rft1, theta_t, out=temp)
+            q_dsh += temp
+
+        return q.T
@@ -3,9 +3,10 @@
 
 ################################################################################
 import clear_sky_insolation as csi # 各方位別 晴天日 全日射量を計算するモジュール
+import solar_position_table as spt # 太陽位置の表を参照するモジュール
+import result_writer as rw # 計算結果をファイルに書き出すモジュール
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import japanize_matplotlib
 #####################################################################################
@@ -24,35 +25,16 @@ def calc_clear_sky(start_t: int, end_t: int, month: int, day: int, Lon:float, La
         全日射量 [W/m2] horizon: 水平面, east: 東面, south: 南面, west: 西面, north: 北面
     """
 
-    # 配列の初期化
-    time = np.zeros(((end_t - start_t) + 1))
-    horizon = np.zeros(((end_t - start_t) + 1))
-    east = np.zeros(((end_t - start_t) + 1))
-    south = np.zeros(((end_t - start_t) + 1))
-    west = np.zeros(((end_t - start_t) + 1))
-    north = np.zeros(((end_t - start_t) + 1))
-    i = 0
-
-    # 各時刻の各方位別の全日射量の計算
-    for i in range(0, (end_t - start_t) + 1, 1): 
-        
-        Time_as, B = csi.s_Time_as(month, day, start_t, Lon, tz) # 真太陽時の計算
-        sin_h = csi.s_sin_h(Lat, month, day, Time_as, B) # 太陽高度の計算
-        A = csi.s_azmth(Lat, month, day, Time_as, B) # 太陽方位角の計算
-        #print(A)
-        Io = csi.s_Io(month, day) # 大気圏外日射量の計算
-        Idn = csi.s_Idn(Io, P, sin_h) # 晴天日 法線面 直達日射量の計算
-        s_Isky = csi.s_Isky(Io, P, sin_h, Idn) # 晴天日 水平面 天空日射量の計算
-        print(Idn, s_Isky)
-        
-        time[i] = start_t
-        horizon[i] = Idn * csi.s_cos_incident(sin_h, A, 0, 0) + 1 * s_Isky # 水平面の直達日射量と天空日射量の和(晴天日 全日射量)
-        east[i] = Idn * csi.s_cos_incident(sin_h, A, 90, -90) + 0.5 * s_Isky # 東面の直達日射量と天空日射量の和(晴天日 全日射量)
-        south[i] = Idn * csi.s_cos_incident(sin_h, A, 90, 0) + 0.5 * s_Isky # 南面の直達日射量と天空日射量の和(晴天日 全日射量) 
-        west[i] = Idn * csi.s_cos_incident(sin_h, A, 90, 90) + 0.5 * s_Isky # 西面の直達日射量と天空日射量の和(晴天日 全日射量)
-        north[i] = Idn * csi.s_cos_incident(sin_h, A, 90, 180) + 0.5 * s_Isky # 北面の直達日射量と天空日射量の和(晴天日 全日射量)
-
-        start_t = start_t + 1 # 時刻の更新
+    # 太陽位置は地点ごとの表から求める（表は初回に計算して保存し、以降はメモリマップで読み込む）
+    table = spt.SolarPositionTable.load(Lat, Lon, tz, step=60)
+    time = np.arange(start_t, end_t + 1, 1, dtype=float)
+    timestamps = np.datetime64('2023-{0:02d}-{1:02d}'.format(month, day)) + time.astype(int) * np.timedelta64(1, 'h')
+    solar_position = table.lookup(timestamps)
+
+    # 各時刻の各方位別の全日射量の計算（水平面、東面、南面、西面、北面）
+    _, _, total = csi.calc_clear_sky_array(
+        timestamps, [Lat], [Lon], tz, P, [0, 90, 90, 90, 90], [0, -90, 0, 90, 180], solar_position=solar_position)
+    horizon, east, south, west, north = total[0]
 
     return time, horizon, east, south, west,north
 
@@ -97,21 +79,51 @@ def save_to_csv(start_t: int, end_t: int, time: np.ndarray, horizon: np.ndarray,
         全日射量 [W/m2] horizon: 水平面, east: 東面, south: 南面, west: 西面, north: 北面
     """
     
-    i = 0
-    data = np.zeros((((end_t-start_t) + 1), 6)) # 配列の初期化
-  
-    # 各時刻の各方位別による全日射量を配列に記憶
-    for i in range(0, (end_t -start_t) + 1, 1):
-            data[i][0] = time[i]
-            data[i][1] = horizon[i]
-            data[i][2] = east[i]
-            data[i][3] = south[i]
-            data[i][4] = west[i]
-            data[i][5] = north[i]
-
-    np.savetxt("日射量.csv", data, fmt="%.2f", delimiter=',') # 計算結果をcsvに保存
-    df = pd.DataFrame(data) # データフレームに変換
-    df.to_csv("日射量.csv", index = False, header=["時刻", "水平面", "東面","南面", "西面", "北面"], encoding="Shift-JIS") # ヘッダを追記
+    columns = ["時刻", "水平面", "東面","南面", "西面", "北面"]
+    # 見出しと計算結果を1回で書き出す
+    with rw.ResultWriter("日射量.csv", columns=columns, encoding="Shift-JIS") as writer:
+        writer.write(dict(zip(columns, [time, horizon, east, south, west, north])))
+
+
+def save_clear_sky(file_path: str, timestamps: np.ndarray, Lon: float, Lat: float, tz: int, P: float,
+                   Wtilt: np.ndarray, Wazm: np.ndarray, columns: list = None, chunk_size: int = 10080,
+                   fmt: str = None) -> int:
+
+    """任意の数の傾斜面の晴天日 全日射量を、時刻のまとまりごとに計算してファイルに書き出す
+        表全体をメモリ上に作らないため、1分間隔の年間値や多数の傾斜面でも使える
+
+        file_path: 書き出すファイルのパス（拡張子 .csv、.parquet、.feather で書式を判定する）
+        timestamps: 日時（地方標準時）
+        Lon: 経度 [deg]、Lat: 緯度 [deg]、tz: 時間ゾーン [h]
+        P: 大気透過率
+        Wtilt: 傾斜面傾斜角 [deg]、Wazm: 傾斜面方位角 [deg]
+        columns: 傾斜面の列名（Noneの場合は "傾斜角_方位角"）
+        chunk_size: 1回に計算、書き出す時刻の数
+        fmt: CSVの数値の書式（Noneの場合は精度を落とさない最短の表現、ファイルを小さくする場合は"%.2f"など）
+
+    Returns: 書き出した行数
+    """
+
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    Wtilt = np.atleast_1d(np.asarray(Wtilt, dtype=float))
+    Wazm = np.atleast_1d(np.asarray(Wazm, dtype=float))
+    if columns is None:
+        columns = ["{0:g}_{1:g}".format(tilt, azm) for tilt, azm in zip(Wtilt, Wazm)]
+
+    # 時刻の列は元日0時からの経過時間 [h]
+    origin = timestamps[0].astype('datetime64[Y]')
+    table = spt.SolarPositionTable.load(Lat, Lon, tz, step=1)
+
+    with rw.ResultWriter(file_path, columns=["時刻"] + list(columns), fmt=fmt) as writer:
+        for start in range(0, len(timestamps), chunk_size):
+            chunk_timestamps = timestamps[start:start + chunk_size]
+            _, _, total = csi.calc_clear_sky_array(
+                chunk_timestamps, [Lat], [Lon], tz, P, Wtilt, Wazm, solar_position=table.lookup(chunk_timestamps))
+            time = (chunk_timestamps - origin) / np.timedelta64(1, 'h')
+            writer.write(np.column_stack([time, total[0].T]))
+        n_rows = writer.n_rows
+
+    return n_rows
 
 if __name__ == '__main__':
     
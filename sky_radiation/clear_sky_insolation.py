@@ -3,9 +3,8 @@
 #################################################
 import math
 from datetime import datetime
+from typing import Optional, Tuple
 import numpy as np
-import matplotlib.pyplot as plt
-import japanize_matplotlib
 
 #################################################
 
@@ -147,4 +146,113 @@ def s_cos_incident(sin_h: float, A: float, Wtilt: float, Wazm:float) -> float:
     else: # 太陽高度がマイナスのとき
         cos_incident = 0 
     
-    return cos_incident
\ No newline at end of file
+    return cos_incident
+
+def s_day_of_year_array(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+
+    """日時の配列から元旦からの日数と標準時を求める
+        timestamps: 日時（地方標準時）の配列（np.datetime64に変換できるもの）
+    Returns:
+        n: 元旦からの日数（元旦を1とする）
+        time: 標準時 [h]（分単位などの端数を含む）
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    days = timestamps.astype('datetime64[D]')
+    n = (days - timestamps.astype('datetime64[Y]').astype('datetime64[D]')).astype(float) + 1.0
+    time = (timestamps - days) / np.timedelta64(1, 'h')
+    return n, time
+
+def calc_solar_position_array(timestamps: np.ndarray, Lat: np.ndarray, Lon: np.ndarray, tz: int) \
+    -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """太陽高度、太陽方位角、大気圏外日射量を配列で一括計算する（s_sin_h、s_azmth、s_Ioの配列版）
+        timestamps: 日時（地方標準時）(n_t,)
+        Lat: 緯度 [deg] (n_sites,)、Lon: 経度 [deg] (n_sites,)、tz: 時間ゾーン [h]
+    Returns:
+        sin_h: 太陽高度の正弦（太陽高度がマイナスのときは0）(n_sites, n_t)
+        A: 太陽方位角 [rad]（南を0、西を正とし、太陽高度がマイナスのときは0）(n_sites, n_t)
+        Io: 大気圏外日射量 [W/m2] (n_t,)
+    """
+    n, time = s_day_of_year_array(timestamps)
+    return calc_solar_position_doy_array(n, time, Lat, Lon, tz)
+
+def calc_solar_position_doy_array(n: np.ndarray, time: np.ndarray, Lat: np.ndarray, Lon: np.ndarray, tz: int) \
+    -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """元旦からの日数と標準時から太陽高度、太陽方位角、大気圏外日射量を配列で一括計算する
+        n: 元旦からの日数（元旦を1とする）(n_t,)、time: 標準時 [h] (n_t,)
+        Lat: 緯度 [deg] (n_sites,)、Lon: 経度 [deg] (n_sites,)、tz: 時間ゾーン [h]
+    Returns:
+        sin_h: 太陽高度の正弦（太陽高度がマイナスのときは0）(n_sites, n_t)
+        A: 太陽方位角 [rad]（南を0、西を正とし、太陽高度がマイナスのときは0）(n_sites, n_t)
+        Io: 大気圏外日射量 [W/m2] (n_t,)
+    """
+    n = np.asarray(n, dtype=float)
+    time = np.asarray(time, dtype=float)
+    Lat = np.radians(np.atleast_1d(np.asarray(Lat, dtype=float)))[:, np.newaxis]
+    Lon = np.atleast_1d(np.asarray(Lon, dtype=float))[:, np.newaxis]
+
+    # 均時差、真太陽時
+    B = np.radians((360 * (n - 81)) / 365)
+    E = 0.1645 * np.sin(2 * B) - 0.1255 * np.cos(B) - 0.025 * np.sin(B)
+    Time_as = time + E + (Lon - tz * 15) / 15
+
+    # 太陽赤緯、太陽高度
+    sin_decl = 0.397949 * np.sin(B)
+    cos_decl = np.cos(np.arcsin(sin_decl))
+    sin_h = np.sin(Lat) * sin_decl + np.cos(Lat) * cos_decl * np.cos(np.radians((Time_as - 12) * 15))
+    sin_h = np.maximum(sin_h, 0.0)
+
+    # 太陽方位角
+    is_day = sin_h > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_A = (sin_h * np.sin(Lat) - sin_decl) / (np.sqrt(1 - sin_h * sin_h) * np.cos(Lat))
+    A = np.arccos(np.clip(cos_A, -1.0, 1.0)) * np.sign(Time_as - 12) # 午後のとき
+    is_pole = np.abs(np.abs(cos_A) - 1) < 0.000001
+    A = np.where(is_pole, np.where(Lat > 0, 0.0, math.pi), A)
+    A = np.where(is_day, A, 0.0)
+
+    # 大気圏外日射量
+    Io = 1382 * (1 + 0.033 * np.cos(2 * math.pi * n / 365))
+
+    return sin_h, A, Io
+
+def calc_clear_sky_array(timestamps: np.ndarray, Lat: np.ndarray, Lon: np.ndarray, tz: int, P: float,
+                         Wtilt: np.ndarray, Wazm: np.ndarray,
+                         solar_position: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) \
+    -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """晴天日の傾斜面日射量を地点、傾斜面、時刻について一括計算する
+        timestamps: 日時（地方標準時）(n_t,)
+        Lat: 緯度 [deg] (n_sites,)、Lon: 経度 [deg] (n_sites,)、tz: 時間ゾーン [h]
+        P: 大気透過率
+        Wtilt: 傾斜面傾斜角 [deg] (n_surfaces,)、Wazm: 傾斜面方位角 [deg] (n_surfaces,)
+        solar_position: 計算済みの (sin_h, A, Io)（solar_position_table参照、Noneの場合はここで計算する）
+    Returns:
+        direct: 傾斜面 直達日射量 [W/m2] (n_sites, n_surfaces, n_t)
+        diffuse: 傾斜面 天空日射量 [W/m2]（天空の形態係数 (1 + cos(傾斜角)) / 2 を掛けたもの）
+        total: 傾斜面 全日射量 [W/m2]
+    """
+    if solar_position is None:
+        solar_position = calc_solar_position_array(timestamps, Lat, Lon, tz)
+    sin_h, A, Io = (np.asarray(v, dtype=float) for v in solar_position)
+    sin_h = np.atleast_2d(sin_h)[:, np.newaxis, :]
+    A = np.atleast_2d(A)[:, np.newaxis, :]
+    Wtilt = np.radians(np.atleast_1d(np.asarray(Wtilt, dtype=float)))[:, np.newaxis]
+    Wazm = np.radians(np.atleast_1d(np.asarray(Wazm, dtype=float)))[:, np.newaxis]
+
+    # 晴天日 法線面 直達日射量、水平面 天空日射量 (n_sites, 1, n_t)
+    is_day = sin_h > 0
+    with np.errstate(divide='ignore'):
+        Idn = np.where(is_day, Io * np.power(P, 1 / sin_h), 0.0)
+    I_sky = np.where(is_day, (Io - Idn) * sin_h * ((0.66 - 0.32 * sin_h) * (0.5 + (0.4 - 0.3 * P) * sin_h)), 0.0)
+
+    # 傾斜面の太陽光入射角 (n_sites, n_surfaces, n_t)
+    cos_incident = np.cos(Wtilt) * sin_h + np.sin(Wtilt) * np.sqrt(1 - sin_h * sin_h) * np.cos(A - Wazm)
+    cos_incident = np.where(is_day, np.maximum(cos_incident, 0.0), 0.0)
+
+    direct = Idn * cos_incident
+    diffuse = I_sky * (1 + np.cos(Wtilt)) / 2
+    total = direct + diffuse
+
+    return direct, diffuse, total
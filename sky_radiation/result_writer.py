@@ -0,0 +1,171 @@
+# 計算結果を行のまとまりごとにファイルへ書き出すモジュール　result_writer.py
+
+#################################################
+import os
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+#################################################
+
+# 拡張子と書式の対応
+RESULT_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'feather'
+}
+
+class ResultWriter:
+
+    """計算結果の表を行のまとまり（チャンク）ごとに書き出す
+        表全体をメモリ上に作らず、チャンクを受け取るたびにファイルへ追記する（見出しは最初に1回だけ書く）
+        CSVはnumpyのみ、Parquet、Featherはpyarrowを使う（pyarrowはParquet、Featherを使う場合のみ必要）
+
+        with ResultWriter('日射量.csv', columns=['時刻', '南面']) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, file_path: str, columns: List[str], format: Optional[str] = None, encoding: str = 'utf-8',
+                 fmt: Optional[str] = None):
+
+        """
+            file_path: 書き出すファイルのパス
+            columns: 列名
+            format: 'csv'、'parquet'、'feather'（Noneの場合は拡張子から判定する）
+            encoding: CSVの文字コード（列名に日本語を使いExcelで開く場合は'Shift-JIS'）
+            fmt: CSVの実数の書式（Noneの場合は、pandasのto_csvと同じく元の値に戻せる最短の表現とし、精度を落とさない）
+                桁数を減らしてファイルを小さくする場合は'%.6g'などを指定する
+        """
+        if format is None:
+            format = RESULT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+        if format not in RESULT_FORMATS.values():
+            raise ValueError('format must be one of {0}'.format(list(RESULT_FORMATS.values())))
+
+        self.file_path = file_path
+        self.columns = list(columns)
+        self.format = format
+        self.fmt = fmt
+        self.n_rows = 0
+        self._closed = False
+
+        if format == 'csv':
+            self._file = open(file_path, 'w', newline='', encoding=encoding)
+            self._file.write(','.join(self.columns) + '\n')
+            self._writer = None
+        else:
+            try:
+                import pyarrow as pa
+            except ImportError as e:
+                raise ImportError('pyarrow is required to write {0} files'.format(format)) from e
+            self._pa = pa
+            self._file = None
+            self._writer = None
+
+    def write(self, chunk: Union[np.ndarray, Dict[str, np.ndarray]]) -> None:
+
+        """チャンクを書き出す
+            chunk: (行数, 列数)の配列、または列名ごとの配列の辞書
+        """
+        if isinstance(chunk, dict):
+            arrays = [np.asarray(chunk[column]) for column in self.columns]
+        else:
+            chunk = np.asarray(chunk)
+            if chunk.ndim != 2 or chunk.shape[1] != len(self.columns):
+                raise ValueError('chunk must have shape (n_rows, {0})'.format(len(self.columns)))
+            arrays = [chunk[:, i] for i in range(chunk.shape[1])]
+        n_rows = len(arrays[0])
+
+        if self.format == 'csv':
+            if self.fmt is None:
+                # Pythonの数値に変換してstrで書き出す（実数はreprと同じく元の値に戻せる最短の表現）
+                lines = zip(*[a.tolist() for a in arrays])
+                self._file.write(''.join(','.join(map(str, line)) + '\n' for line in lines))
+            elif all(a.dtype.kind == 'f' for a in arrays):
+                np.savetxt(self._file, np.column_stack(arrays), fmt=self.fmt, delimiter=',')
+            else:
+                # 文字列、整数の列がある場合は列ごとの型のまま書き出す（実数の列のみfmtを使う）
+                fmt = [self.fmt if a.dtype.kind == 'f' else '%s' for a in arrays]
+                np.savetxt(self._file, np.column_stack([a.astype(object) for a in arrays]), fmt=fmt, delimiter=',')
+        else:
+            pa = self._pa
+            table = pa.Table.from_arrays([pa.array(a) for a in arrays], names=self.columns)
+            if self._writer is None:
+                self._writer = self._open_arrow_writer(table.schema)
+            self._writer.write_table(table)
+
+        self.n_rows += n_rows
+
+    def _open_arrow_writer(self, schema):
+
+        """最初のチャンクの型でParquet、Featherの書き出しを開始する"""
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.file_path, schema)
+        else:
+            import pyarrow.ipc as ipc
+            # Feather（バージョン2）はArrowのIPCファイル形式
+            self._file = self._pa.OSFile(self.file_path, 'wb')
+            return ipc.new_file(self._file, schema)
+
+    def close(self) -> None:
+
+        """ファイルを閉じる"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.format != 'csv' and self._writer is None:
+            # チャンクが無い場合も列名だけの表を書き出す
+            pa = self._pa
+            self._writer = self._open_arrow_writer(pa.schema([(column, pa.float64()) for column in self.columns]))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+if __name__ == '__main__':
+
+    import tempfile
+
+    # 書き出した値を読み戻して確かめる（Parquet、Featherはpyarrowがある場合のみ）
+    rng = np.random.default_rng(0)
+    columns = ['地点', '番号', '値']
+    chunks = [{'地点': np.array(['東京', '大阪', '那覇']), '番号': np.arange(3) + 3 * i, '値': rng.normal(size=3)}
+              for i in range(2)]
+    expected = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in columns}
+
+    try:
+        import pyarrow
+        formats = list(RESULT_FORMATS.values())
+    except ImportError:
+        print('pyarrow is not installed: skip parquet, feather')
+        formats = ['csv']
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for format in formats:
+            file_path = os.path.join(temp_dir, 'result.' + format)
+            with ResultWriter(file_path, columns=columns) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+
+            if format == 'csv':
+                data = np.genfromtxt(file_path, delimiter=',', names=True, dtype=None, encoding='utf-8')
+                actual = {column: data[column] for column in columns}
+            else:
+                if format == 'parquet':
+                    import pyarrow.parquet as pq
+                    table = pq.read_table(file_path)
+                else:
+                    import pyarrow.feather as feather
+                    table = feather.read_table(file_path)
+                actual = {column: table.column(column).to_numpy() for column in columns}
+
+            is_equal = all(np.array_equal(actual[column], expected[column]) for column in columns)
+            print(format, writer.n_rows, 'round trip:', is_equal)
@@ -0,0 +1,238 @@
+# 太陽位置の表を事前計算し、メモリマップで参照するモジュール　solar_position_table.py
+
+#################################################
+import os
+import math
+import hashlib
+import tempfile
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+import clear_sky_insolation as csi
+
+#################################################
+
+# 太陽位置の表の保存先
+SOLAR_POSITION_CACHE_DIR = os.environ.get(
+    'SOLAR_POSITION_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'solar_position'))
+# 表に含める日数（閏年の12月31日と、補間用の翌年元旦を含める）
+N_TABLE_DAYS = 367
+# 計算方法を変更したときに表を作り直すためのバージョン
+_SOLAR_POSITION_TABLE_VERSION = 2
+
+@lru_cache(maxsize=1)
+def calc_solar_day_table() -> Dict[str, np.ndarray]:
+
+    """日ごとの均時差、太陽赤緯、大気圏外日射量の表を計算する（s_ETime、s_sin_decl、s_Ioの配列版）
+    Returns:
+        日数 n（元旦を1とする）- 1 を添字とする配列の辞書（書き換え不可）
+            B: s_ETimeのB、E: 均時差 [h]、sin_decl: 太陽赤緯の正弦、Io: 大気圏外日射量 [W/m2]
+    """
+    n = np.arange(1, N_TABLE_DAYS + 1, dtype=float)
+    B = (360 * (n - 81)) / 365
+    B_rad = np.radians(B)
+    table = {
+        'B': B,
+        'E': 0.1645 * np.sin(2 * B_rad) - 0.1255 * np.cos(B_rad) - 0.025 * np.sin(B_rad),
+        'sin_decl': 0.397949 * np.sin(B_rad),
+        'Io': 1382 * (1 + 0.033 * np.cos(2 * math.pi * n / 365))
+    }
+    for v in table.values():
+        v.flags.writeable = False
+    return table
+
+def calc_solar_position_key(Lat: float, Lon: float, tz: int, step: int) -> str:
+
+    """地点と時間間隔から太陽位置の表のキーを計算する
+        Lat: 緯度 [deg]、Lon: 経度 [deg]、tz: 時間ゾーン [h]、step: 時間間隔 [min]
+    Returns:
+        key: 表のキー（SHA-256）
+    """
+    condition = '{0}|{1!r}|{2!r}|{3}|{4}'.format(
+        _SOLAR_POSITION_TABLE_VERSION, float(Lat), float(Lon), int(tz), int(step))
+    return hashlib.sha256(condition.encode()).hexdigest()
+
+class SolarPositionTable:
+
+    """1地点の1年分の太陽の方向の表
+        表は時間間隔stepごとの太陽の方向の単位ベクトル（天頂、西、南の成分）で、.npyファイルに保存してメモリマップで読み込む
+        太陽高度がマイナスの時刻も値を0とせずに保存し、表の時刻の間は成分を3次補間してから
+        太陽高度の正弦を0以上とし、夜間の方位角を0とする（日の出、日の入り前後の補間に夜間の値が混ざらない）
+        同じ地点の傾斜面はすべて同じ表を参照するため、三角関数の計算は表を作るときの1回だけになる
+    """
+
+    def __init__(self, Lat: float, Lon: float, tz: int, step: int, vector: np.ndarray):
+
+        """
+            Lat: 緯度 [deg]、Lon: 経度 [deg]、tz: 時間ゾーン [h]、step: 時間間隔 [min]（1440の約数）
+            vector: 太陽の方向の単位ベクトル (3, N_TABLE_DAYS * 1440 / step)
+                sin(h)（太陽高度がマイナスの場合も0としない）、cos(h)*sin(A)、cos(h)*cos(A)（Aは南を0、西を正とする）
+        """
+        self.Lat = Lat
+        self.Lon = Lon
+        self.tz = tz
+        self.step = step
+        self.n_steps_per_day = 1440 // step
+        self.vector = vector
+
+    @classmethod
+    def build(cls, Lat: float, Lon: float, tz: int, step: int = 60) -> 'SolarPositionTable':
+
+        """表を計算する（ファイルには保存しない）
+            Lat: 緯度 [deg]、Lon: 経度 [deg]、tz: 時間ゾーン [h]、step: 時間間隔 [min]（1440の約数）
+        """
+        if step <= 0 or 1440 % step != 0:
+            raise ValueError('step must be a divisor of 1440 minutes')
+        n_steps_per_day = 1440 // step
+        day = calc_solar_day_table()
+        i_day = np.repeat(np.arange(N_TABLE_DAYS), n_steps_per_day)
+        time = np.tile(np.arange(n_steps_per_day) * step / 60, N_TABLE_DAYS)
+
+        # 真太陽時、時角（calc_solar_position_doy_arrayと同じ式）
+        Time_as = time + day['E'][i_day] + (Lon - tz * 15) / 15
+        omega = np.radians((Time_as - 12) * 15)
+        sin_decl = day['sin_decl'][i_day]
+        cos_decl = np.cos(np.arcsin(sin_decl))
+        sin_Lat = math.sin(math.radians(Lat))
+        cos_Lat = math.cos(math.radians(Lat))
+
+        vector = np.stack([
+            sin_Lat * sin_decl + cos_Lat * cos_decl * np.cos(omega),
+            cos_decl * np.sin(omega),
+            sin_Lat * cos_decl * np.cos(omega) - cos_Lat * sin_decl])
+        return cls(Lat=Lat, Lon=Lon, tz=tz, step=step, vector=vector)
+
+    @classmethod
+    def load(cls, Lat: float, Lon: float, tz: int, step: int = 60, cache_dir: Optional[str] = None) \
+        -> 'SolarPositionTable':
+
+        """保存した表をメモリマップで読み込む（無い場合は計算して保存する）
+            保存先に書き込めない場合は保存せずに計算した表を返す
+            Lat: 緯度 [deg]、Lon: 経度 [deg]、tz: 時間ゾーン [h]、step: 時間間隔 [min]（1440の約数）
+            cache_dir: 表の保存先（Noneの場合はSOLAR_POSITION_CACHE_DIR）
+        """
+        if cache_dir is None:
+            cache_dir = SOLAR_POSITION_CACHE_DIR
+        return _load_solar_position_table(float(Lat), float(Lon), int(tz), int(step), cache_dir)
+
+    def lookup(self, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+        """日時の太陽位置を表から求める
+            表の時刻に一致する場合は表の値、一致しない場合は前後2つずつの値から3次補間（Catmull-Rom）した
+            単位ベクトルを正規化して求める
+            timestamps: 日時（地方標準時）(n_t,)
+        Returns:
+            sin_h: 太陽高度の正弦（太陽高度がマイナスのときは0）(n_t,)
+            A: 太陽方位角 [rad]（南を0、西を正とし、太陽高度がマイナスのときは0） (n_t,)
+            Io: 大気圏外日射量 [W/m2] (n_t,)
+        """
+        n, time = csi.s_day_of_year_array(timestamps)
+        Io = calc_solar_day_table()['Io'][n.astype(int) - 1]
+
+        position = (n - 1) * self.n_steps_per_day + time * 60 / self.step
+        i1 = np.floor(position).astype(int)
+        s = position - i1
+        if np.all(s == 0.0):
+            z, y, x = self.vector[:, i1]
+        else:
+            n_table = self.vector.shape[1]
+            i0 = np.maximum(i1 - 1, 0)
+            i2 = np.minimum(i1 + 1, n_table - 1)
+            i3 = np.minimum(i1 + 2, n_table - 1)
+            s2 = s * s
+            s3 = s2 * s
+            c0 = - 0.5 * s3 + s2 - 0.5 * s
+            c1 = 1.5 * s3 - 2.5 * s2 + 1
+            c2 = - 1.5 * s3 + 2 * s2 + 0.5 * s
+            c3 = 0.5 * s3 - 0.5 * s2
+            z, y, x = (c0 * v[i0] + c1 * v[i1] + c2 * v[i2] + c3 * v[i3] for v in self.vector)
+            norm = np.sqrt(z * z + y * y + x * x)
+            z, y, x = z / norm, y / norm, x / norm
+
+        # 補間した後に夜間の値とする
+        sin_h = np.maximum(z, 0.0)
+        A = np.where(sin_h > 0, np.arctan2(y, x), 0.0)
+        return sin_h, A, Io
+
+    def lookup_sh_sw_ss(self, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+        """ETDの計算（calc_etd.calc_sh_sw_ss）で使う太陽位置を表から求める
+            方位角は calc_etd.calc_wz_ww_ws と同じく南を0、東を正とする
+            timestamps: 日時（地方標準時）(n_t,)
+        Returns:
+            sh: sin(h)、sw: cos(h)*sin(a)、ss: cos(h)*cos(a) (n_t,)
+        """
+        sin_h, A, _ = self.lookup(timestamps)
+        cos_h = np.sqrt(1 - sin_h * sin_h)
+        return sin_h, - cos_h * np.sin(A), cos_h * np.cos(A)
+
+@lru_cache(maxsize=256)
+def _load_solar_position_table(Lat: float, Lon: float, tz: int, step: int, cache_dir: str) -> SolarPositionTable:
+
+    """地点ごとに読み込んだ表をプロセス内で保持する"""
+    key = calc_solar_position_key(Lat, Lon, tz, step)
+    file_path = os.path.join(cache_dir, key + '.npy')
+
+    try:
+        data = np.load(file_path, mmap_mode='r')
+    except (OSError, ValueError):
+        data = None
+
+    if data is None:
+        table = SolarPositionTable.build(Lat=Lat, Lon=Lon, tz=tz, step=step)
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.npy', dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, table.vector)
+            # 同じキーは同じ内容なので、後から書いたプロセスが置き換えてもよい
+            os.replace(temp_path, file_path)
+            data = np.load(file_path, mmap_mode='r')
+        except OSError:
+            # 保存先に書き込めない場合は保存せずに計算した表を使う
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return table
+
+    return SolarPositionTable(Lat=Lat, Lon=Lon, tz=tz, step=step, vector=data)
+
+if __name__ == '__main__':
+
+    import time
+
+    Lon = 139.77 # 経度 [deg]
+    Lat = 35.68 # 緯度 [deg]
+    tz = 9 # 時間ゾーン [h]
+    P = 0.66 # 大気透過率
+
+    # 1分間隔の1年分の日時
+    timestamps = np.arange(np.datetime64('2023-01-01'), np.datetime64('2024-01-01'), np.timedelta64(1, 'm'))
+    # 方位別の鉛直面
+    Wtilt = np.full(16, 90.0)
+    Wazm = np.arange(16) * 22.5 - 180
+
+    start = time.perf_counter()
+    table = SolarPositionTable.load(Lat, Lon, tz, step=1)
+    solar_position = table.lookup(timestamps)
+    print('lookup: {0:.3f} s'.format(time.perf_counter() - start))
+
+    direct, diffuse, total = csi.calc_clear_sky_array(
+        timestamps, [Lat], [Lon], tz, P, Wtilt, Wazm, solar_position=solar_position)
+    print(total.shape, np.sum(total, axis=-1) / 60 / 1000) # 年間積算日射量 [kWh/m2]
+
+    # 表の時刻と一致しない日時（1時間間隔の表に対して1分間隔）で、表を使わない計算と比べる
+    table = SolarPositionTable.load(Lat, Lon, tz, step=60)
+    n, time_as = csi.s_day_of_year_array(timestamps)
+    sin_h_exact, A_exact, Io = csi.calc_solar_position_doy_array(n, time_as, [Lat], [Lon], tz)
+    sin_h, A, _ = table.lookup(timestamps)
+    # 方位角の差には、calc_solar_position_doy_arrayが南中付近の方位角を0に丸める分を含む
+    is_day = sin_h_exact[0] > 0.05
+    print('sin_h error: {0:.2e}, A error: {1:.2e} rad'.format(
+        np.max(np.abs(sin_h - sin_h_exact[0])), np.max(np.abs(A - A_exact[0])[is_day])))
+    _, _, total_exact = csi.calc_clear_sky_array(
+        timestamps, [Lat], [Lon], tz, P, Wtilt, Wazm, solar_position=(sin_h_exact, A_exact, Io))
+    _, _, total = csi.calc_clear_sky_array(
+        timestamps, [Lat], [Lon], tz, P, Wtilt, Wazm, solar_position=table.lookup(timestamps))
+    print('total error: {0:.2f} W/m2'.format(np.max(np.abs(total - total_exact))))